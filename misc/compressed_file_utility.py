@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+'''
+FILE:           compressed_file_utility.py
+
+DESCRIPTION:    This script contains the functions and classes used by
+                FileCropUtility to read gzip and zstd compressed data files.
+
+BUGS:
+NOTES:      zstd support requires the zstandard package.  Files written in
+            the zstd seekable format (independent frames followed by a seek
+            table, see contrib/seekable_format in the zstd repository) are
+            opened as SeekableZstdFile objects so only the frames that are
+            needed are decompressed.  Other compressed files are read as
+            streams.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import os
+import gzip
+import queue
+import struct
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# zstd seekable format, the seek table is stored in a skippable frame at the
+# end of the file
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_TABLE_FOOTER_SIZE = 9
+
+# Number of decompressed bytes read from a compressed stream at a time
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Number of decompressed chunks buffered by the background decompression
+# thread
+DEFAULT_QUEUE_SIZE = 8
+
+# Number of decompressed frames SeekableZstdFile keeps in memory
+DEFAULT_FRAME_CACHE_SIZE = 4
+
+def detect_compression(path):
+    '''
+    Return 'gzip' or 'zstd' based on the magic bytes at the start of the file
+    or None if the file is not compressed.
+    '''
+
+    with open(path, 'rb') as file:
+        magic = file.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+
+    return None
+
+
+def _require_zstandard():
+
+    if zstandard is None:
+        raise RuntimeError("The zstandard package is required to read zstd compressed files")
+
+
+def read_seek_table(file):
+    '''
+    Return the frames listed in the seek table of the open zstd file as a
+    list of (compressed_offset, compressed_size, decompressed_offset,
+    decompressed_size) tuples or None if the file does not end with a seek
+    table.
+    '''
+
+    file_size = file.seek(0, os.SEEK_END)
+
+    if file_size < SEEK_TABLE_FOOTER_SIZE + 8:
+        return None
+
+    file.seek(file_size - SEEK_TABLE_FOOTER_SIZE)
+    frame_count, descriptor, magic = struct.unpack('<IBI', file.read(SEEK_TABLE_FOOTER_SIZE))
+
+    if magic != SEEKABLE_MAGIC:
+        return None
+
+    entry_size = 12 if descriptor & 0x80 else 8
+    table_size = frame_count * entry_size + SEEK_TABLE_FOOTER_SIZE
+
+    if file_size < table_size + 8:
+        return None
+
+    file.seek(file_size - table_size - 8)
+    skippable_magic, frame_size = struct.unpack('<II', file.read(8))
+
+    if skippable_magic != SKIPPABLE_FRAME_MAGIC or frame_size != table_size:
+        return None
+
+    table = file.read(frame_count * entry_size)
+
+    frames = []
+    compressed_offset = 0
+    decompressed_offset = 0
+    for idx in range(frame_count):
+        compressed_size, decompressed_size = struct.unpack_from('<II', table, idx * entry_size)
+        frames.append((compressed_offset, compressed_size, decompressed_offset, decompressed_size))
+        compressed_offset += compressed_size
+        decompressed_offset += decompressed_size
+
+    return frames
+
+
+def open_seekable(path):
+    '''
+    Return a SeekableZstdFile for the given path or None if the file is not
+    a zstd file in the seekable format.
+    '''
+
+    if detect_compression(path) != 'zstd':
+        return None
+
+    with open(path, 'rb') as file:
+        if read_seek_table(file) is None:
+            return None
+
+    return SeekableZstdFile(path)
+
+
+def iter_decompressed_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Yield the decompressed contents of the gzip/zstd compressed file (or the
+    contents of an uncompressed file) chunk_size bytes at a time.
+    '''
+
+    compression = detect_compression(path)
+
+    if compression == 'gzip':
+        reader = gzip.open(path, 'rb')
+
+    elif compression == 'zstd':
+        _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+
+    else:
+        reader = open(path, 'rb')
+
+    with reader:
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                return
+
+            yield chunk
+
+
+def first_line(chunks):
+    '''
+    Return the first line from an iterable of byte chunks.
+    '''
+
+    head = b''
+
+    try:
+        for chunk in chunks:
+            head += chunk
+            idx = head.find(b'\n')
+            if idx != -1:
+                return head[:idx + 1]
+
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+    return head
+
+
+def last_line(chunks):
+    '''
+    Return the last line from an iterable of byte chunks.  A trailing newline
+    is considered part of the last line.
+    '''
+
+    tail = b''
+
+    for chunk in chunks:
+        tail += chunk
+
+        # ignore the final character so a trailing newline stays with the last line
+        idx = tail.rfind(b'\n', 0, len(tail) - 1)
+        if idx != -1:
+            tail = tail[idx + 1:]
+
+    return tail
+
+
+class _ProducerError():
+    '''
+    Wrapper for an exception raised by the background decompression thread.
+    '''
+
+    def __init__(self, error):
+        self.error = error
+
+
+_END_OF_CHUNKS = object()
+
+def iter_lines_threaded(chunks, queue_size=DEFAULT_QUEUE_SIZE):
+    '''
+    Yield the lines (bytes, including the newline) from an iterable of byte
+    chunks.  The chunks are produced, i.e. decompressed, on a background
+    thread while the caller processes the lines.
+    '''
+
+    chunk_queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                chunk_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+
+            put(_END_OF_CHUNKS)
+
+        except Exception as err:
+            put(_ProducerError(err))
+
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        pending = b''
+
+        while True:
+            chunk = chunk_queue.get()
+
+            if chunk is _END_OF_CHUNKS:
+                break
+
+            if isinstance(chunk, _ProducerError):
+                raise chunk.error
+
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+
+            for line in lines:
+                yield line + b'\n'
+
+        if pending:
+            yield pending
+
+    finally:
+        stopped.set()
+        producer.join()
+
+
+class SeekableZstdFile():
+    '''
+    Class that provides random access to the decompressed contents of a zstd
+    file in the seekable format.  It supports the subset of the mmap
+    interface (len, slicing and find) and of the binary file interface (seek,
+    tell, read and readline) used by FileCropUtility.  Only the frames that
+    are accessed are decompressed and the most recently used frames are
+    cached.
+    '''
+
+    def __init__(self, path, frame_cache_size=DEFAULT_FRAME_CACHE_SIZE):
+        _require_zstandard()
+
+        self._path = path
+        self._file = open(path, 'rb')
+        self._frames = read_seek_table(self._file)
+
+        if self._frames is None:
+            self._file.close()
+            raise ValueError("Not a seekable zstd file: {}".format(path))
+
+        self._frame_offsets = [frame[2] for frame in self._frames]
+        self._size = self._frames[-1][2] + self._frames[-1][3] if self._frames else 0
+        self._dctx = zstandard.ZstdDecompressor()
+        self._cache = OrderedDict()
+        self._frame_cache_size = max(1, frame_cache_size)
+        self._pos = 0
+
+    def _decompress_frame(self, idx, dctx, file):
+        compressed_offset, compressed_size, _, decompressed_size = self._frames[idx]
+
+        file.seek(compressed_offset)
+        return dctx.decompress(file.read(compressed_size), max_output_size=decompressed_size)
+
+    def _frame_data(self, idx):
+        '''
+        Return the decompressed contents of the frame at the given index.
+        '''
+
+        if idx in self._cache:
+            self._cache.move_to_end(idx)
+            return self._cache[idx]
+
+        data = self._decompress_frame(idx, self._dctx, self._file)
+
+        self._cache[idx] = data
+        if len(self._cache) > self._frame_cache_size:
+            self._cache.popitem(last=False)
+
+        return data
+
+    def _frame_index(self, offset):
+        return bisect_right(self._frame_offsets, offset) - 1
+
+    def _read_range(self, start, stop):
+        '''
+        Return the decompressed bytes between start and stop.
+        '''
+
+        start = max(0, min(start, self._size))
+        stop = max(start, min(stop, self._size))
+
+        parts = []
+        pos = start
+        while pos < stop:
+            idx = self._frame_index(pos)
+            frame_start = self._frame_offsets[idx]
+            data = self._frame_data(idx)
+
+            part = data[pos - frame_start:stop - frame_start]
+            if not part:
+                break
+
+            parts.append(part)
+            pos += len(part)
+
+        return b''.join(parts)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("SeekableZstdFile only supports contiguous slices")
+
+        start, stop, _ = key.indices(self._size)
+        return self._read_range(start, stop)
+
+    def find(self, sub, start=0, end=None):
+        '''
+        Return the lowest offset of sub between start and end or -1, like
+        mmap.find.
+        '''
+
+        end = self._size if end is None else min(end, self._size)
+        overlap = len(sub) - 1
+
+        pos = start
+        while pos < end:
+            idx = self._frame_index(pos)
+            frame_start = self._frame_offsets[idx]
+            frame_stop = min(frame_start + self._frames[idx][3], end)
+
+            # include enough of the next frame to find sub spanning frames
+            window = self._read_range(pos, min(frame_stop + overlap, end))
+            found = window.find(sub)
+            if found != -1:
+                return pos + found
+
+            pos = frame_stop
+
+        return -1
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        '''
+        Change the read position, like file.seek.
+        '''
+
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._size
+
+        if offset < 0:
+            raise OSError("Invalid seek position")
+
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        '''
+        Return the read position, like file.tell.
+        '''
+
+        return self._pos
+
+    def read(self, size=-1):
+        '''
+        Read up to size decompressed bytes, like file.read.
+        '''
+
+        stop = self._size if size is None or size < 0 else self._pos + size
+        data = self._read_range(self._pos, stop)
+        self._pos += len(data)
+
+        return data
+
+    def readline(self):
+        '''
+        Read one decompressed line, like file.readline.
+        '''
+
+        idx = self.find(b'\n', self._pos)
+        return self.read((idx + 1 if idx != -1 else self._size) - self._pos)
+
+    def iter_chunks(self, start=0, stop=None):
+        '''
+        Yield the decompressed bytes between start and stop one frame at a
+        time.  Uses its own decompression context and file handle so it can
+        be consumed on a background thread.
+        '''
+
+        stop = self._size if stop is None else min(stop, self._size)
+        dctx = zstandard.ZstdDecompressor()
+
+        with open(self._path, 'rb') as file:
+            pos = start
+            while pos < stop:
+                idx = self._frame_index(pos)
+                frame_start = self._frame_offsets[idx]
+
+                data = self._decompress_frame(idx, dctx, file)[pos - frame_start:stop - frame_start]
+                if not data:
+                    return
+
+                yield data
+                pos += len(data)
+
+    def close(self):
+        '''
+        Close the compressed file.
+        '''
+
+        self._cache.clear()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def frame_count(self):
+        '''
+        Number of frames in the file
+        '''
+        return len(self._frames)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+'''
+FILE:           filecrop_benchmark.py
+
+DESCRIPTION:    Simple script to measure the timestamp parsing and file
+                cropping throughput of FileCropUtility, in lines per second,
+                using a generated time-ordered data file.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import os
+import time
+import logging
+import tempfile
+from datetime import datetime, timedelta
+
+from python_sealog.timestamps import SEALOG_TS_FORMAT, parse_ts
+from filecrop_utility import FileCropUtility
+
+START_DT = datetime(2021, 1, 1)
+
+def _build_data_file(line_count):
+    '''
+    Write a time-ordered data file with one line per second and return its
+    path.
+    '''
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as file:
+        for idx in range(line_count):
+            file.write((START_DT + timedelta(seconds=idx)).strftime(SEALOG_TS_FORMAT) + ',41.5243,-70.6711,1234.5,271.3\n')
+
+    return file.name
+
+
+def _report(label, line_count, elapsed):
+    print("{:<40} {:>12,.0f} lines/sec ({:.3f} sec)".format(label, line_count / elapsed, elapsed))
+
+
+def _time_parser(label, lines, parser):
+    start = time.perf_counter()
+    for line in lines:
+        parser(line.split(',', 1)[0])
+
+    _report(label, len(lines), time.perf_counter() - start)
+
+
+def _time_crop(label, line_count, data_file, crop_utility, **kwargs):
+    start = time.perf_counter()
+    sum(1 for _ in crop_utility.crop_file_data(data_file, **kwargs))
+
+    _report(label, line_count, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description='FileCropUtility benchmark')
+    parser.add_argument('-n', '--lines', type=int, default=1000000, help='number of lines in the generated data file (default: %(default)s)')
+    parser.add_argument('-w', '--window', type=int, default=3600, help='length of the cropped time window in seconds (default: %(default)s)')
+
+    parsed_args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    benchmark_file = _build_data_file(parsed_args.lines)
+
+    try:
+        with open(benchmark_file, 'r') as data:
+            benchmark_lines = data.readlines()
+
+        print("Timestamp parsing ({:,} lines)".format(parsed_args.lines))
+        _time_parser("  datetime.strptime", benchmark_lines, lambda ts: datetime.strptime(ts, SEALOG_TS_FORMAT))
+        _time_parser("  parse_ts", benchmark_lines, parse_ts)
+
+        # crop the middle of the file
+        window_start = START_DT + timedelta(seconds=parsed_args.lines // 2)
+        window_stop = window_start + timedelta(seconds=parsed_args.window)
+
+        print("Cropping a {:,} sec window (throughput relative to the file size)".format(parsed_args.window))
+        _time_crop("  linear scan", parsed_args.lines, benchmark_file, FileCropUtility(window_start, window_stop), use_bisection=False)
+        _time_crop("  linear scan, string compare", parsed_args.lines, benchmark_file, FileCropUtility(window_start, window_stop, compare_strings=True), use_bisection=False)
+        _time_crop("  bisection", parsed_args.lines, benchmark_file, FileCropUtility(window_start, window_stop))
+        _time_crop("  bisection, string compare", parsed_args.lines, benchmark_file, FileCropUtility(window_start, window_stop, compare_strings=True))
+
+    finally:
+        os.remove(benchmark_file)
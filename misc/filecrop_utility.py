@@ -6,7 +6,8 @@ DESCRIPTION:    This class handles culling subsets of data from files based on
                 start/stop times.
 
 BUGS:
-NOTES:
+NOTES:      gzip and zstd compressed data files are supported, see
+            compressed_file_utility.py.
 AUTHOR:     Webb Pinner
 COMPANY:    OceanDataTools.org
 VERSION:    0.1
@@ -18,20 +19,257 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 '''
 
 import os
+import json
+import mmap
+import heapq
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from python_sealog.timestamps import get_ts_parser, is_lexicographic_format, match_ts_width, build_ts_pattern, parse_ts, to_ts_string
+from compressed_file_utility import detect_compression, open_seekable, iter_decompressed_chunks, iter_lines_threaded, first_line, last_line
+
+# Number of bytes read at a time when reading the last line of a file
+TAIL_BLOCK_SIZE = 4096
+
+# Once the binary search has narrowed the window to this many bytes the
+# remaining lines are filtered linearly
+LINEAR_SCAN_BYTES = 64 * 1024
+
+def _line_start_after(data_map, pos):
+    '''
+    Return the offset of the first line that starts at or after pos.
+    '''
+
+    if pos == 0:
+        return 0
+
+    idx = data_map.find(b'\n', pos - 1)
+    return len(data_map) if idx == -1 else idx + 1
+
+
+def _decode_line(line):
+    '''
+    Return the line read in binary mode as a string, matching text-mode
+    universal newlines.
+    '''
+
+    if line.endswith(b'\r\n'):
+        line = line[:-2] + b'\n'
+    elif line.endswith(b'\r'):
+        line = line[:-1] + b'\n'
+
+    return line.decode()
+
+
+def _iter_map_lines(data_map, start, stop):
+    '''
+    Yield the lines (bytes) of the memory-mapped file between the start/stop
+    byte offsets.
+    '''
+
+    pos = start
+    while pos < stop:
+        end = data_map.find(b'\n', pos, stop)
+        end = stop if end == -1 else end + 1
+
+        yield data_map[pos:end]
+        pos = end
+
+
+def _read_last_line(file):
+    '''
+    Return the last line of the open binary file, reading backwards from the
+    end of the file TAIL_BLOCK_SIZE bytes at a time.  A trailing newline is
+    considered part of the last line.
+    '''
+
+    pos = file.seek(0, os.SEEK_END)
+    tail = b''
+
+    while pos > 0:
+        read_size = min(TAIL_BLOCK_SIZE, pos)
+        pos -= read_size
+        file.seek(pos)
+        tail = file.read(read_size) + tail
+
+        # ignore the final character so a trailing newline stays with the last line
+        idx = tail.rfind(b'\n', 0, len(tail) - 1)
+        if idx != -1:
+            return tail[idx + 1:]
+
+    return tail
+
+
+class FileTimeRangeIndex():
+    '''
+    Class that maintains a json index of the first/last timestamps of data
+    files so they do not have to be re-read every time the files are culled.
+    An entry is refreshed only when the size or mtime of its file changes.
+    '''
+
+    def __init__(self, index_file, delimiter=',', dt_format='%Y-%m-%dT%H:%M:%S.%fZ'):
+        self._index_file = index_file
+        self._settings = {'delimiter': delimiter, 'dt_format': dt_format}
+        self._entries = {}
+        self._dirty = False
+
+        try:
+            with open(self._index_file, 'r') as file:
+                index = json.load(file)
+
+            if index.get('settings') == self._settings:
+                self._entries = index.get('files', {})
+            else:
+                logging.debug("File time-range index settings changed, rebuilding: %s", self._index_file)
+
+        except FileNotFoundError:
+            pass
+
+        except Exception as err:
+            logging.warning("Could not read file time-range index, rebuilding: %s", self._index_file)
+            logging.debug(str(err))
+
+    def get(self, data_file, read_time_range):
+        '''
+        Return (first_line, first_ts, last_line, last_ts) for data_file from
+        the index, calling read_time_range(data_file) to refresh the entry if
+        the file has changed since it was indexed.  The lines are only
+        returned for timestamps that could not be processed.
+        '''
+
+        path = os.path.abspath(data_file)
+        stat = os.stat(path)
+        entry = self._entries.get(path)
+
+        if entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            head_line, first_ts, tail_line, last_ts = read_time_range(data_file)
+
+            entry = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'first_ts': to_ts_string(first_ts) if first_ts is not None else None,
+                'last_ts': to_ts_string(last_ts) if last_ts is not None else None,
+                'first_line': head_line if first_ts is None else None,
+                'last_line': tail_line if last_ts is None else None
+            }
+
+            self._entries[path] = entry
+            self._dirty = True
+
+        return (
+            entry['first_line'],
+            parse_ts(entry['first_ts']) if entry['first_ts'] is not None else None,
+            entry['last_line'],
+            parse_ts(entry['last_ts']) if entry['last_ts'] is not None else None
+        )
+
+    def save(self):
+        '''
+        Save the index if any entries were refreshed.
+        '''
+
+        if not self._dirty:
+            return
+
+        tmp_path = self._index_file + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'settings': self._settings, 'files': self._entries}, file)
+
+        os.replace(tmp_path, self._index_file)
+        self._dirty = False
+
+
+def _crop_file(crop_args, data_file, use_bisection):
+    '''
+    Return the cropped lines from a single file.  Run in a worker process by
+    FileCropUtility.crop_file_data.
+    '''
+
+    return list(FileCropUtility(*crop_args)._crop_file_data(data_file, use_bisection)) # pylint: disable=protected-access
+
+
 class FileCropUtility():
     '''
     This class handles culling subsets of data from files based on start/stop
-    times.
+    times.  Set compare_strings to True to compare the timestamps as plain
+    strings instead of parsing them to datetime objects, this requires a
+    dt_format whose timestamps sort lexicographically (i.e. the default) and
+    compares timestamps at the resolution they are written in the file.
+    Optionally define an index_file where the first/last timestamps of the
+    data files are kept between runs.
     '''
 
-    def __init__(self, start_dt=datetime(1970, 1, 1, 0, 0, 0, tzinfo=None), stop_dt=datetime.utcnow(), delimiter=',', dt_format='%Y-%m-%dT%H:%M:%S.%fZ'):
+    def __init__(self, start_dt=datetime(1970, 1, 1, 0, 0, 0, tzinfo=None), stop_dt=datetime.utcnow(), delimiter=',', dt_format='%Y-%m-%dT%H:%M:%S.%fZ', compare_strings=False, index_file=None): # pylint: disable=too-many-arguments
         self.start_dt = start_dt
         self.stop_dt = stop_dt
         self.delimiter = delimiter
         self.dt_format = dt_format
+        self.compare_strings = compare_strings and is_lexicographic_format(dt_format)
+        self._parse_ts = get_ts_parser(dt_format)
+        self._index = FileTimeRangeIndex(index_file, delimiter, dt_format) if index_file else None
+
+        if compare_strings and not self.compare_strings:
+            logging.warning("Timestamps in format %s can not be compared as strings, parsing them instead", dt_format)
+
+    def _parse_time_range(self, head_line, read_tail_line):
+        '''
+        Return (first_line, first_ts, last_line, last_ts) from the first line
+        of a file and a function that returns its last line.  The timestamps
+        are None if the line could not be processed, last_line/last_ts are
+        None if the first line could not be processed.
+        '''
+
+        head_line = head_line.decode().rstrip('\n')
+        try:
+            first_ts = self._parse_ts(head_line.split(self.delimiter)[0])
+        except Exception as err:
+            logging.debug(str(err))
+            return head_line, None, None, None
+
+        tail_line = read_tail_line().decode().rstrip('\n')
+
+        try:
+            last_ts = self._parse_ts(tail_line.split(self.delimiter)[0])
+        except Exception as err:
+            logging.debug(str(err))
+            last_ts = None
+
+        return head_line, first_ts, tail_line, last_ts
+
+    def _read_file_time_range(self, data_file):
+        '''
+        Peek at the first/last lines in the file and return (first_line,
+        first_ts, last_line, last_ts).  Seekable zstd files only decompress
+        the first/last frames, other compressed files have to be decompressed
+        to the end to find the last line.
+        '''
+
+        compression = detect_compression(data_file)
+
+        if compression is None:
+            with open( data_file, 'rb' ) as file :
+                return self._parse_time_range(file.readline(), lambda: _read_last_line(file))
+
+        seekable_file = open_seekable(data_file) if compression == 'zstd' else None
+
+        if seekable_file is not None:
+            with seekable_file as file:
+                return self._parse_time_range(file.readline(), lambda: _read_last_line(file))
+
+        return self._parse_time_range(first_line(iter_decompressed_chunks(data_file)), lambda: last_line(iter_decompressed_chunks(data_file)))
+
+    def _get_file_time_range(self, data_file):
+        '''
+        Return (first_line, first_ts, last_line, last_ts) for data_file, from
+        the index_file if one is defined.
+        '''
+
+        if self._index is None:
+            return self._read_file_time_range(data_file)
+
+        return self._index.get(data_file, self._read_file_time_range)
 
     def cull_files(self, data_files):
         '''
@@ -47,70 +285,346 @@ class FileCropUtility():
 
         for data_file in data_files:
             logging.debug("File: %s", data_file)
-            with open( data_file, 'rb' ) as file :
-                first_line = file.readline().decode().rstrip('\n')
-                try:
-                    first_ts = datetime.strptime(first_line.split(self.delimiter)[0],self.dt_format)
-
-                except Exception as err:
-                    logging.warning("Could not process first line in %s: %s", data_file, first_line)
-                    logging.debug(str(err))
-                    continue
 
-                logging.debug("    First line: %s", first_line)
-                logging.debug("    First timestamp: %s", first_ts)
+            head_line, first_ts, tail_line, last_ts = self._get_file_time_range(data_file)
 
-                file.seek(-2, os.SEEK_END)
-                while file.read(1) != b'\n':
-                    file.seek(-2, os.SEEK_CUR)
+            if first_ts is None:
+                logging.warning("Could not process first line in %s: %s", data_file, head_line)
+                continue
 
-                last_line = file.readline().decode().rstrip('\n')
+            logging.debug("    First line: %s", head_line)
+            logging.debug("    First timestamp: %s", first_ts)
 
-                try:
-                    last_ts = datetime.strptime(last_line.split(self.delimiter)[0],self.dt_format)
-                except Exception as err:
-                    logging.warning("Could not process last line in %s: %s", data_file, last_line)
-                    logging.debug(str(err))
-                    continue
+            if last_ts is None:
+                logging.warning("Could not process last line in %s: %s", data_file, tail_line)
+                continue
 
-                logging.debug("    Last line: %s", last_line)
-                logging.debug("    Last timestamp: %s", last_ts)
+            logging.debug("    Last line: %s", tail_line)
+            logging.debug("    Last timestamp: %s", last_ts)
 
             if not ((self.start_dt - last_ts).total_seconds() > 0 or (first_ts - self.stop_dt).total_seconds() > 0):
                 logging.debug("    ** Include this file **")
                 culled_files.append(data_file)
 
+        if self._index is not None:
+            self._index.save()
+
         logging.debug("Culled file list: \n\t%s", '\n\t'.join(culled_files))
         return culled_files
 
-    def crop_file_data(self, data_files):
+    def _merge_groups(self, data_files):
         '''
-        Read the file(s) and return on the data from between the start/stop
-        timestamps.
+        Return the data_files sorted by their first timestamp and split into
+        groups of files whose time ranges overlap.  If the time range of any
+        file can not be determined all files are returned as one group.
         '''
 
-        logging.info("Cropping file data")
+        ranges = []
+        for data_file in data_files:
+            try:
+                _, first_ts, _, last_ts = self._get_file_time_range(data_file)
+            except Exception as err:
+                logging.debug(str(err))
+                first_ts = last_ts = None
 
-        if not isinstance(data_files, list):
-            data_files = [data_files]
+            if first_ts is None or last_ts is None:
+                logging.debug("Could not determine time range of %s, merging all files", data_file)
+                return [list(data_files)]
 
-        for data_file in data_files:
-            logging.debug("File: %s", data_file)
-            with open( data_file, 'r' ) as file :
-                while True:
-                    line_str = file.readline()
+            ranges.append((first_ts, last_ts, data_file))
 
-                    if not line_str:
-                        break
+        if self._index is not None:
+            self._index.save()
 
-                    try:
-                        line_ts = datetime.strptime(line_str.split(self.delimiter)[0],self.dt_format)
+        ranges.sort(key=lambda file_range: file_range[0])
 
-                    except Exception as err:
-                        logging.warning("Could not process line: %s", line_str)
-                        logging.debug(str(err))
+        groups = []
+        group_stop_ts = None
+        for first_ts, last_ts, data_file in ranges:
+            if groups and first_ts <= group_stop_ts:
+                groups[-1].append(data_file)
+                group_stop_ts = max(group_stop_ts, last_ts)
+            else:
+                groups.append([data_file])
+                group_stop_ts = last_ts
 
+        return groups
+
+    def _crop_file_data_parallel(self, data_files, use_bisection, processes):
+        '''
+        Crop the data_files in a pool of processes and yield the lines in time
+        order.  Files that do not overlap are concatenated, files that do are
+        merged line by line.  At most 2 x processes cropped files are held in
+        memory at once.
+        '''
+
+        groups = self._merge_groups(data_files)
+        logging.debug("Cropping %d file(s) in %d group(s) using %d processes", len(data_files), len(groups), processes)
+
+        crop_args = (self.start_dt, self.stop_dt, self.delimiter, self.dt_format, self.compare_strings)
+        file_queue = iter([data_file for group in groups for data_file in group])
+        pending = deque()
+
+        def merge_key(line):
+            return self._parse_ts(line.split(self.delimiter, 1)[0])
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+
+            def submit_next():
+                data_file = next(file_queue, None)
+                if data_file is not None:
+                    pending.append(executor.submit(_crop_file, crop_args, data_file, use_bisection))
+
+            try:
+                for _ in range(2 * processes):
+                    submit_next()
+
+                for group in groups:
+                    results = []
+                    for _ in group:
+                        results.append(pending.popleft().result())
+                        submit_next()
+
+                    if len(results) == 1:
+                        yield from results[0]
                     else:
+                        yield from heapq.merge(*results, key=merge_key)
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _is_timestamped(self, line):
+        '''
+        Return True if the line starts with a timestamp in dt_format.
+        '''
+
+        try:
+            self._parse_ts(line.split(self.delimiter, 1)[0])
+        except Exception:
+            return False
+
+        return True
+
+    def _find_sample_line(self, data_map):
+        '''
+        Return the first line of the memory-mapped (or SeekableZstdFile) file
+        that starts with a timestamp, searching at most LINEAR_SCAN_BYTES, or None.
+        '''
 
-                        if (line_ts - self.start_dt).total_seconds() >= 0 and (self.stop_dt - line_ts).total_seconds() >= 0:
-                            yield line_str
+        pos = 0
+        while pos < min(len(data_map), LINEAR_SCAN_BYTES):
+            end = data_map.find(b'\n', pos)
+            end = len(data_map) if end == -1 else end + 1
+
+            line = data_map[pos:end].decode(errors='replace')
+            if self._is_timestamped(line):
+                return line
+
+            pos = end
+
+        return None
+
+    def _build_line_key(self, sample_line=None):
+        '''
+        Return (line_key, start_key, stop_key) where line_key returns the
+        comparable timestamp of a line or None if the line could not be
+        processed, and start_key/stop_key are the comparable start/stop
+        timestamps.  In compare_strings mode the keys are timestamp strings
+        formatted to the same resolution as the sample_line's timestamp.
+        '''
+
+        delimiter = self.delimiter
+
+        if not self.compare_strings:
+            ts_parser = self._parse_ts
+
+            def parse_line_key(line):
+                try:
+                    return ts_parser(line.split(delimiter, 1)[0])
+                except Exception:
+                    return None
+
+            return parse_line_key, self.start_dt, self.stop_dt
+
+        start_key = self.start_dt.strftime(self.dt_format)
+        stop_key = self.stop_dt.strftime(self.dt_format)
+
+        if sample_line is not None:
+            sample = sample_line.split(delimiter, 1)[0]
+            start_key = match_ts_width(start_key, sample)
+            stop_key = match_ts_width(stop_key, sample)
+
+        ts_pattern = build_ts_pattern(start_key)
+
+        def string_line_key(line):
+            ts = line.split(delimiter, 1)[0] # pylint: disable=invalid-name
+            return ts if ts_pattern.fullmatch(ts) else None
+
+        return string_line_key, start_key, stop_key
+
+    @staticmethod
+    def _bisect_offset(data_map, hi, line_key, before_target):
+        '''
+        Binary search the memory-mapped (or SeekableZstdFile) file for the byte offset of the line
+        where before_target(line_key(line)) stops being True.  Lines that can
+        not be processed are ignored.  The search stops once the remaining
+        window is smaller than LINEAR_SCAN_BYTES so the returned offsets
+        bracket the target by at most that many bytes.  Returns (lo, hi) line
+        offsets.
+        '''
+
+        lo = 0
+
+        while hi - lo > LINEAR_SCAN_BYTES:
+            mid = _line_start_after(data_map, (lo + hi) // 2)
+
+            if mid >= hi:
+                break
+
+            # find the first processable line at or after mid
+            pos = mid
+            key = None
+            while pos < hi:
+                end = data_map.find(b'\n', pos)
+                end = len(data_map) if end == -1 else end + 1
+
+                key = line_key(data_map[pos:end].decode(errors='replace'))
+                if key is not None:
+                    break
+
+                pos = end
+
+            if key is None or not before_target(key):
+                hi = mid
+            else:
+                lo = end
+
+        return lo, hi
+
+    def find_byte_range(self, data_map, line_key=None, start_key=None, stop_key=None):
+        '''
+        Return the (start, stop) byte offsets of the memory-mapped (or
+        SeekableZstdFile), time-ordered file that bracket the lines between the start/stop timestamps.  The
+        range may include up to LINEAR_SCAN_BYTES of lines outside the
+        start/stop timestamps at either end.
+        '''
+
+        if line_key is None:
+            line_key, start_key, stop_key = self._build_line_key()
+
+        start_offset, _ = self._bisect_offset(data_map, len(data_map), line_key, lambda key: key < start_key)
+        _, stop_offset = self._bisect_offset(data_map, len(data_map), line_key, lambda key: key <= stop_key)
+
+        return start_offset, max(start_offset, stop_offset)
+
+    def _filter_lines(self, lines, line_key=None, start_key=None, stop_key=None, stop_early=False): # pylint: disable=too-many-arguments
+        '''
+        Yield the lines that are between the start/stop keys.  If line_key is
+        None the keys are built from the first timestamped line.  Set
+        stop_early to stop at the first line after the stop key, i.e. for
+        time-ordered files that can not be searched.
+        '''
+
+        for line_str in lines:
+
+            # the line keys are built from the first timestamped line
+            if line_key is None and self._is_timestamped(line_str):
+                line_key, start_key, stop_key = self._build_line_key(line_str)
+
+            key = line_key(line_str) if line_key is not None else None
+
+            if key is None:
+                logging.warning("Could not process line: %s", line_str)
+
+            elif start_key <= key <= stop_key:
+                yield line_str
+
+            elif stop_early and key > stop_key:
+                return
+
+    def _crop_file_data_bisect(self, data_file):
+        '''
+        Yield the lines from the time-ordered data_file that are between the
+        start/stop timestamps, only reading the byte range that contains them.
+        Seekable zstd files are searched frame by frame, other compressed
+        files are read from the start up to the stop timestamp.
+        '''
+
+        compression = detect_compression(data_file)
+        seekable_file = open_seekable(data_file) if compression == 'zstd' else None
+
+        if compression is not None and seekable_file is None:
+            logging.debug("    %s file is not seekable, reading up to the stop timestamp", compression)
+            lines = iter_lines_threaded(iter_decompressed_chunks(data_file))
+            yield from self._filter_lines(map(_decode_line, lines), stop_early=True)
+            return
+
+        if seekable_file is not None:
+            with seekable_file as data_map:
+                line_key, start_key, stop_key = self._build_line_key(self._find_sample_line(data_map))
+
+                start_offset, stop_offset = self.find_byte_range(data_map, line_key, start_key, stop_key)
+                logging.debug("    Byte range: %d-%d of %d (%d frames)", start_offset, stop_offset, len(data_map), data_map.frame_count)
+
+                lines = iter_lines_threaded(data_map.iter_chunks(start_offset, stop_offset))
+                yield from self._filter_lines(map(_decode_line, lines), line_key, start_key, stop_key)
+
+            return
+
+        with open( data_file, 'rb' ) as file :
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data_map:
+                line_key, start_key, stop_key = self._build_line_key(self._find_sample_line(data_map))
+
+                start_offset, stop_offset = self.find_byte_range(data_map, line_key, start_key, stop_key)
+                logging.debug("    Byte range: %d-%d of %d", start_offset, stop_offset, len(data_map))
+
+                lines = _iter_map_lines(data_map, start_offset, stop_offset)
+                yield from self._filter_lines(map(_decode_line, lines), line_key, start_key, stop_key)
+
+    def _crop_file_data(self, data_file, use_bisection=True):
+        '''
+        Yield the lines from a single data_file that are between the start/stop
+        timestamps.
+        '''
+
+        logging.debug("File: %s", data_file)
+
+        if use_bisection:
+            yield from self._crop_file_data_bisect(data_file)
+            return
+
+        if detect_compression(data_file) is not None:
+            lines = iter_lines_threaded(iter_decompressed_chunks(data_file))
+            yield from self._filter_lines(map(_decode_line, lines))
+            return
+
+        with open( data_file, 'r' ) as file :
+            yield from self._filter_lines(file)
+
+    def crop_file_data(self, data_files, use_bisection=True, processes=1):
+        '''
+        Read the file(s) and return on the data from between the start/stop
+        timestamps.  The files are assumed to be time-ordered and are binary
+        searched for the start/stop timestamps so only the lines in between
+        are read.  Set use_bisection to False to read every line of files that
+        are not time-ordered.  Set processes to crop the files concurrently in
+        that many processes, the lines are then yielded in time order across
+        all files instead of file by file.  gzip and zstd compressed files are
+        decompressed on a background thread while the lines are filtered.
+        '''
+
+        logging.info("Cropping file data")
+
+        if not isinstance(data_files, list):
+            data_files = [data_files]
+
+        if processes > 1 and len(data_files) > 1:
+            yield from self._crop_file_data_parallel(data_files, use_bisection, processes)
+            return
+
+        for data_file in data_files:
+            yield from self._crop_file_data(data_file, use_bisection)
@@ -6,7 +6,12 @@ DESCRIPTION:    This script builds a sealog aux_data record with data pulled fro
                 influx database.
 
 BUGS:
-NOTES:
+NOTES:      SealogInfluxAuxDataBatchQuery queries the data for several
+            SealogInfluxAuxDataRecordBuilders with a single influxDB query.
+            See ring_buffer_backend.py for builders that keep the sensor
+            data in memory.
+            SealogInfluxAuxDataBackfill builds the aux_data records for many
+            past events from a few range queries.
 AUTHOR:     Webb Pinner
 COMPANY:    OceanDataTools.org
 VERSION:    0.1
@@ -19,11 +24,99 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 import sys
 import json
 import logging
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from datetime import timedelta
 from urllib3.exceptions import NewConnectionError
 from influxdb_client.rest import ApiException
+from python_sealog.timestamps import parse_ts, to_ts_string
 from .settings import INFLUX_SERVER_URL, INFLUX_TOKEN, INFLUX_ORG, INFLUX_BUCKET
 
+# How far before an event's ts to look for the latest sensor values
+QUERY_LOOKBACK = timedelta(minutes=1)
+
+def _build_field_filter(measurements, fields):
+    '''
+    Return the flux filter expression that matches records from any of the
+    measurements with any of the fields.
+    '''
+
+    return '({}) and ({})'.format(' or '.join([ 'r["_measurement"] == "{}"'.format(q_measurement) for q_measurement in measurements]), ' or '.join([ 'r["_field"] == "{}"'.format(q_field) for q_field in fields]))
+
+
+def _run_query(query_api, query):
+    '''
+    Run the query against the influxDB and return the result or None if the
+    query failed.
+    '''
+
+    try:
+        return query_api.query(query=query)
+
+    except NewConnectionError:
+        logging.error("InfluxDB connection error, verify URL: %s", INFLUX_SERVER_URL)
+
+    except ApiException as err:
+        _, value, _ = sys.exc_info()
+
+        if str(value).startswith("(400)"):
+            logging.error("InfluxDB API error, verify org: %s", INFLUX_ORG)
+        elif str(value).startswith("(401)"):
+            logging.error("InfluxDB API error, verify token: %s", INFLUX_TOKEN)
+        elif str(value).startswith("(404)"):
+            logging.error("InfluxDB API error, verify bucket: %s", INFLUX_BUCKET)
+        else:
+            raise err
+
+    except Exception as err:
+        logging.error("Error with query:")
+        logging.error(query.replace("|>", '\n'))
+        logging.error(str(err))
+
+    return None
+
+
+def _build_builders_filter(aux_data_builders):
+    '''
+    Return the flux filter expression that matches the records used by any
+    of the aux_data_builders, one clause per unique measurements/fields
+    combination so only the requested measurement/field pairs are returned.
+    '''
+
+    field_filters = list(dict.fromkeys([ _build_field_filter(builder.measurements, builder.fields) for builder in aux_data_builders ]))
+
+    return ' or '.join([ '({})'.format(field_filter) for field_filter in field_filters ])
+
+
+def _compile_aux_record_lookup(aux_record_lookup):
+    '''
+    Compile the aux_record_lookup config into the list of output plans used to
+    build each aux_data record.  Each plan is a (field, data_name, round,
+    data_uom, modifiers) tuple where round is None if the value is not
+    rounded and modifiers is a list of (tests, multipliers) tuples, tests
+    being the (field, has_eq, eq) tuples of the modify test and multipliers
+    the values applied, in order, if any of the tests pass.
+    '''
+
+    plans = []
+
+    for key, value in aux_record_lookup.items():
+        if "no_output" in value and value['no_output'] is True:
+            continue
+
+        modifiers = []
+        for mod_op in value.get('modify', []):
+            if 'test' not in mod_op:
+                continue
+
+            tests = [ (test['field'], 'eq' in test, test.get('eq')) for test in mod_op['test'] if 'field' in test ]
+            multipliers = [ operan['multiply'] for operan in mod_op.get('operation', []) if 'multiply' in operan ]
+            modifiers.append((tests, multipliers))
+
+        plans.append((key, value['name'], value['round'] if 'round' in value else None, value['uom'] if 'uom' in value else '', modifiers))
+
+    return plans
+
+
 class SealogInfluxAuxDataRecordBuilder():
     '''
     Class that handles the construction of an influxDB query and using the
@@ -36,6 +129,8 @@ class SealogInfluxAuxDataRecordBuilder():
         self._query_fields = list(aux_data_config['aux_record_lookup'].keys())
         self._aux_record_lookup = aux_data_config['aux_record_lookup']
         self._datasource = aux_data_config['data_source']
+        self._output_plans = _compile_aux_record_lookup(self._aux_record_lookup)
+        self._query_template = self._build_query_template()
         self.logger = logging.getLogger(__name__)
 
     @staticmethod
@@ -45,49 +140,56 @@ class SealogInfluxAuxDataRecordBuilder():
         timestamp (ts).
         '''
         try:
-            start_ts = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%S.%fZ") - timedelta(minutes=1)
-            return "start: {}, stop: {}".format(start_ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),ts)
+            start_ts = parse_ts(ts) - QUERY_LOOKBACK
+            return "start: {}, stop: {}".format(to_ts_string(start_ts),ts)
         except Exception as err:
             logging.debug(str(err))
             return None
 
-    def _build_query(self, ts): # pylint: disable=invalid-name
+    def _build_query_template(self):
         '''
-        Builds the complete influxDB query using the provided timestamp (ts)
-        and the class instance's query_measurements and query_fields values.
+        Builds the (prefix, suffix) of the influxDB query from the class
+        instance's query_measurements and query_fields values.  The query
+        range goes between the two.
         '''
 
-        query_range = self._build_query_range(ts)
-
         try:
-            query = 'from(bucket: "{}")\
-|> range({})\
-|> filter(fn: (r) => {})\
+            return ('from(bucket: "{}")\
+|> range('.format(INFLUX_BUCKET), ')\
 |> filter(fn: (r) => {})\
 |> sort(columns: ["_time"], desc: true)\
-|> limit(n:1)'.format(INFLUX_BUCKET, query_range, ' or '.join([ 'r["_measurement"] == "{}"'.format(q_measurement) for q_measurement in self._query_measurements]), ' or '.join([ 'r["_field"] == "{}"'.format(q_field) for q_field in self._query_fields]))
+|> limit(n:1)'.format(_build_field_filter(self._query_measurements, self._query_fields)))
         except Exception as err:
             logging.error("Error building query string")
-            logging.error(" - Range: %s", query_range)
             logging.error(" - Measurements: %s", self._query_measurements)
             logging.error(" - Fields: %s", self._query_fields)
             raise err
 
+    def _build_query(self, ts): # pylint: disable=invalid-name
+        '''
+        Builds the complete influxDB query using the provided timestamp (ts)
+        and the class instance's query template.
+        '''
+
+        query = str(self._build_query_range(ts)).join(self._query_template)
+
         logging.debug("Query: %s", query)
         return query
 
-    def _build_aux_data_dict(self, event_id, influx_query_result): # pylint: disable=too-many-branches
+    def matches(self, record):
+        '''
+        Return True if the influxDB record is from one of the class
+        instance's query_measurements and query_fields.
+        '''
+
+        return record.get_measurement() in self._query_measurements and record.get_field() in self._query_fields
+
+    def _build_aux_data_dict(self, event_id, influx_query_result):
         '''
         Internal method to build the sealog aux_data record using the event_id,
         influx_query_result and the class instance's datasource value.
         '''
 
-        aux_data_record = {
-            'event_id': event_id,
-            'data_source': self._datasource,
-            'data_array': []
-        }
-
         influx_data = {
         }
 
@@ -96,52 +198,65 @@ class SealogInfluxAuxDataRecordBuilder():
 
                 influx_data[record.get_field()] = record.get_value()
 
-        logging.debug("raw values: %s", json.dumps(influx_data, indent=2))
+        return self.build_aux_data_record_from_values(event_id, influx_data)
+
+    def build_aux_data_record_from_values(self, event_id, influx_data):
+        '''
+        Build the sealog aux_data record for the event_id from a dict of the
+        latest influxDB values keyed by field name.
+        '''
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("raw values: %s", json.dumps(influx_data, indent=2))
 
         if not influx_data:
             return None
 
-        for key, value in self._aux_record_lookup.items(): # pylint: disable=too-many-nested-blocks
-            if "no_output" in value and value['no_output'] is True:
-                continue
+        data_array = []
 
+        for key, data_name, round_digits, data_uom, modifiers in self._output_plans:
             output_value = influx_data[key]
 
-            if "modify" in value:
-                logging.debug("modify found in record")
-                for mod_op in value['modify']:
-                    if 'test' in mod_op:
-                        logging.debug("test found in mod_op")
-                        test_result = False
-                        for test in mod_op['test']:
-                            logging.debug(json.dumps(test))
-
-                            if 'field' in test:
-                                if test['field'] not in influx_data:
-                                    logging.error("test field data not in influx query")
-                                    return None
-
-                                if 'eq' in test and influx_data[test['field']] == test['eq']:
-                                    test_result = True
-                                    break
-
-                        if test_result and 'operation' in mod_op:
-                            logging.debug("operation found in mod_op")
-                            for operan in mod_op['operation']:
-                                if 'multiply' in operan:
-                                    output_value *= operan['multiply']
-
-            aux_data_record['data_array'].append({
-                'data_name': value['name'],
-                'data_value': str(round(output_value, value['round'])) if 'round' in value else str(output_value),
-                'data_uom': value['uom'] if 'uom' in value else ''
+            for tests, multipliers in modifiers:
+                test_result = False
+                for field, has_eq, eq in tests: # pylint: disable=invalid-name
+                    if field not in influx_data:
+                        logging.error("test field data not in influx query")
+                        return None
+
+                    if has_eq and influx_data[field] == eq:
+                        test_result = True
+                        break
+
+                if test_result:
+                    for multiplier in multipliers:
+                        output_value *= multiplier
+
+            data_array.append({
+                'data_name': data_name,
+                'data_value': str(round(output_value, round_digits)) if round_digits is not None else str(output_value),
+                'data_uom': data_uom
             })
 
-        if len(aux_data_record['data_array']) > 0:
-            return aux_data_record
+        if len(data_array) > 0:
+            return {
+                'event_id': event_id,
+                'data_source': self._datasource,
+                'data_array': data_array
+            }
 
         return None
 
+    def build_buffered_aux_data_record(self, event): # pylint: disable=unused-argument
+        '''
+        Build the aux_data record for the given event without querying the
+        influxDB.  Returns (covered, aux_data_record) where covered is False
+        if the influxDB has to be queried instead.  Overridden by builders
+        that keep the sensor data locally.
+        '''
+
+        return False, None
+
     def build_aux_data_record(self, event):
         '''
         Build the aux_data record for the given event.
@@ -152,35 +267,12 @@ class SealogInfluxAuxDataRecordBuilder():
 
         logging.debug("Query: %s", query)
         # run the query against the influxDB
-        try:
-            query_result = self._influxdb_client.query(query=query)
-
-        except NewConnectionError:
-            logging.error("InfluxDB connection error, verify URL: %s", INFLUX_SERVER_URL)
-
-        except ApiException as err:
-            _, value, _ = sys.exc_info()
-
-            if str(value).startswith("(400)"):
-                logging.error("InfluxDB API error, verify org: %s", INFLUX_ORG)
-            elif str(value).startswith("(401)"):
-                logging.error("InfluxDB API error, verify token: %s", INFLUX_TOKEN)
-            elif str(value).startswith("(404)"):
-                logging.error("InfluxDB API error, verify bucket: %s", INFLUX_BUCKET)
-            else:
-                raise err
-
-        except Exception as err:
-            logging.error("Error with query:")
-            logging.error(query.replace("|>", '\n'))
-            logging.error(str(err))
-
-        else:
-            aux_data_record = self._build_aux_data_dict(event['id'], query_result)
+        query_result = _run_query(self._influxdb_client, query)
 
-            return aux_data_record
+        if query_result is None:
+            return None
 
-        return None
+        return self._build_aux_data_dict(event['id'], query_result)
 
     @property
     def datasource(self):
@@ -209,3 +301,277 @@ class SealogInfluxAuxDataRecordBuilder():
         Getter method for the _aux_record_lookup property
         '''
         return self._aux_record_lookup
+
+
+class SealogInfluxAuxDataBatchQuery():
+    '''
+    Class that builds the aux_data records for several
+    SealogInfluxAuxDataRecordBuilders from a single influxDB query.  The
+    latest value of every measurement/field used by any of the builders is
+    retrieved with last() and the result is split back out per builder.
+    Builders that can build the record from locally buffered data are not
+    included in the query.
+    '''
+
+    def __init__(self, influxdb_client, aux_data_builders):
+        self._influxdb_client = influxdb_client.query_api()
+        self._aux_data_builders = aux_data_builders
+        self._query_templates = {}
+
+    def _get_query_template(self, builder_indexes):
+        '''
+        Returns the (prefix, suffix) of the influxDB query covering the
+        query_measurements and query_fields of the builders at the given
+        indexes, building it the first time it is needed.  The query range
+        goes between the two.
+        '''
+
+        if builder_indexes in self._query_templates:
+            return self._query_templates[builder_indexes]
+
+        builders = [ self._aux_data_builders[idx] for idx in builder_indexes ]
+
+        try:
+            query_template = ('from(bucket: "{}")\
+|> range('.format(INFLUX_BUCKET), ')\
+|> filter(fn: (r) => {})\
+|> last()'.format(_build_builders_filter(builders)))
+        except Exception as err:
+            logging.error("Error building batch query string")
+            logging.error(" - Data sources: %s", [ builder.datasource for builder in builders ])
+            raise err
+
+        self._query_templates[builder_indexes] = query_template
+        return query_template
+
+    def _build_query(self, ts, builder_indexes): # pylint: disable=invalid-name
+        '''
+        Builds the influxDB query for the provided timestamp (ts) and the
+        builders at the given indexes.
+        '''
+
+        query = str(SealogInfluxAuxDataRecordBuilder._build_query_range(ts)).join(self._get_query_template(builder_indexes)) # pylint: disable=protected-access
+
+        logging.debug("Query: %s", query)
+        return query
+
+    def _split_query_result(self, influx_query_result, builder_indexes):
+        '''
+        Return a list with the dict of latest values keyed by field name for
+        each of the builders at the given indexes.
+        '''
+
+        builders = [ self._aux_data_builders[idx] for idx in builder_indexes ]
+        influx_data = [ {} for _ in builders ]
+
+        for table in influx_query_result:
+            for record in table.records:
+                for idx, builder in enumerate(builders):
+                    if builder.matches(record):
+                        influx_data[idx][record.get_field()] = record.get_value()
+
+        return influx_data
+
+    def build_aux_data_records(self, event):
+        '''
+        Build the aux_data records for the given event.  Returns a list with
+        the aux_data record, or None if there was no data or it could not be
+        built, for each builder.
+        '''
+
+        aux_data_records = [ None for _ in self._aux_data_builders ]
+        builder_indexes = []
+
+        for idx, builder in enumerate(self._aux_data_builders):
+            try:
+                covered, aux_data_record = builder.build_buffered_aux_data_record(event)
+            except Exception as err:
+                logging.warning("Could not build %s aux data record for event: %s", builder.datasource, event['id'])
+                logging.debug(str(err))
+                continue
+
+            if covered:
+                aux_data_records[idx] = aux_data_record
+            else:
+                builder_indexes.append(idx)
+
+        if not builder_indexes:
+            return aux_data_records
+
+        builder_indexes = tuple(builder_indexes)
+        query = self._build_query(event['ts'], builder_indexes)
+
+        # run the query against the influxDB
+        query_result = _run_query(self._influxdb_client, query)
+
+        if query_result is None:
+            return aux_data_records
+
+        for idx, influx_data in zip(builder_indexes, self._split_query_result(query_result, builder_indexes)):
+            builder = self._aux_data_builders[idx]
+
+            try:
+                aux_data_records[idx] = builder.build_aux_data_record_from_values(event['id'], influx_data)
+            except Exception as err:
+                logging.warning("Could not build %s aux data record for event: %s", builder.datasource, event['id'])
+                logging.debug(str(err))
+
+        return aux_data_records
+
+    @property
+    def builders(self):
+        '''
+        Getter method for the _aux_data_builders property
+        '''
+        return self._aux_data_builders
+
+
+class SealogInfluxAuxDataBackfill():
+    '''
+    Class that builds the aux_data records for a list of past events, i.e.
+    events created while the aux data inserter was not running.  Instead of
+    one influxDB query per event the data covering all of the events is
+    retrieved with a few range queries and each event is joined with the
+    latest sample of each field in the minute before the event (the same
+    window used by SealogInfluxAuxDataRecordBuilder).
+    '''
+
+    def __init__(self, influxdb_client, aux_data_builders, lookback=QUERY_LOOKBACK, query_window=timedelta(hours=1)):
+        self._influxdb_client = influxdb_client.query_api()
+        self._aux_data_builders = aux_data_builders
+        self._lookback = lookback
+        self._query_window = query_window
+        self._query_filter = _build_builders_filter(aux_data_builders)
+
+    def _build_query_ranges(self, event_dts):
+        '''
+        Return the list of (start, stop) datetimes to query so that every
+        event's lookback window is covered.  Overlapping windows are merged
+        and windows closer together than query_window share a query.
+        '''
+
+        query_ranges = []
+
+        for event_dt in sorted(event_dts):
+            start_dt = event_dt - self._lookback
+
+            if query_ranges and start_dt - query_ranges[-1][0] <= self._query_window:
+                query_ranges[-1][1] = max(query_ranges[-1][1], event_dt)
+            else:
+                query_ranges.append([start_dt, event_dt])
+
+        return [ tuple(query_range) for query_range in query_ranges ]
+
+    def _build_query(self, start_dt, stop_dt):
+        '''
+        Builds the influxDB range query returning every sample between
+        start_dt and stop_dt for the query_measurements and query_fields of
+        all the builders.
+        '''
+
+        try:
+            query = 'from(bucket: "{}")\
+|> range(start: {}, stop: {})\
+|> filter(fn: (r) => {})\
+|> keep(columns: ["_time", "_measurement", "_field", "_value"])'.format(INFLUX_BUCKET, to_ts_string(start_dt), to_ts_string(stop_dt), self._query_filter)
+        except Exception as err:
+            logging.error("Error building backfill query string")
+            logging.error(" - Range: %s - %s", start_dt, stop_dt)
+            logging.error(" - Data sources: %s", [ builder.datasource for builder in self._aux_data_builders ])
+            raise err
+
+        logging.debug("Query: %s", query)
+        return query
+
+    def _query_samples(self, event_dts):
+        '''
+        Return a list with a dict for each builder of (times, values) lists
+        sorted by time and keyed by field name.  Returns None if any of the
+        queries failed.
+        '''
+
+        samples = [ {} for _ in self._aux_data_builders ]
+
+        for start_dt, stop_dt in self._build_query_ranges(event_dts):
+
+            # flux range stops are exclusive, as they are for the live query
+            query_result = _run_query(self._influxdb_client, self._build_query(start_dt, stop_dt))
+
+            if query_result is None:
+                return None
+
+            for table in query_result:
+                for record in table.records:
+                    sample = (record.get_time().replace(tzinfo=None), record.get_value())
+
+                    for idx, builder in enumerate(self._aux_data_builders):
+                        if builder.matches(record):
+                            samples[idx].setdefault(record.get_field(), []).append(sample)
+
+        return [ { field: tuple(map(list, zip(*sorted(field_samples, key=lambda sample: sample[0])))) for field, field_samples in builder_samples.items() } for builder_samples in samples ]
+
+    def _lookup_values(self, builder_samples, event_dt):
+        '''
+        Return the dict of the latest value of each field in the lookback
+        window before event_dt.
+        '''
+
+        influx_data = {}
+
+        for field, (times, values) in builder_samples.items():
+            idx = bisect_left(times, event_dt) - 1
+
+            if idx >= 0 and times[idx] >= event_dt - self._lookback:
+                influx_data[field] = values[idx]
+
+        return influx_data
+
+    def build_aux_data_records(self, events):
+        '''
+        Build the aux_data records for the given events.  Returns the list of
+        aux_data records that could be built or None if the influxDB could not
+        be queried.
+        '''
+
+        event_dts = []
+        for event in events:
+            try:
+                event_dts.append(parse_ts(event['ts']))
+            except Exception as err:
+                logging.warning("Could not process event ts: %s", event.get('ts'))
+                logging.debug(str(err))
+                event_dts.append(None)
+
+        if not self._aux_data_builders or all(event_dt is None for event_dt in event_dts):
+            return []
+
+        samples = self._query_samples([ event_dt for event_dt in event_dts if event_dt is not None ])
+
+        if samples is None:
+            return None
+
+        aux_data_records = []
+
+        for event, event_dt in zip(events, event_dts):
+            if event_dt is None:
+                continue
+
+            for builder, builder_samples in zip(self._aux_data_builders, samples):
+                try:
+                    aux_data_record = builder.build_aux_data_record_from_values(event['id'], self._lookup_values(builder_samples, event_dt))
+                except Exception as err:
+                    logging.warning("Could not build %s aux data record for event: %s", builder.datasource, event['id'])
+                    logging.debug(str(err))
+                    continue
+
+                if aux_data_record:
+                    aux_data_records.append(aux_data_record)
+
+        return aux_data_records
+
+    @property
+    def builders(self):
+        '''
+        Getter method for the _aux_data_builders property
+        '''
+        return self._aux_data_builders
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+'''
+FILE:           ring_buffer_backend.py
+
+DESCRIPTION:    This script contains the classes used to keep the recent
+                values of the sensor data broadcast over UDP in memory so
+                that the aux_data records for new events can be built
+                without querying the influx database.
+
+BUGS:
+NOTES:      Each field is kept in a fixed-size ring buffer of timestamps and
+            values backed by the array module.  Lookups that fall outside
+            the time covered by the buffers are answered by InfluxDB.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import time
+import socket
+import logging
+import threading
+from array import array
+from datetime import timezone
+
+from python_sealog.timestamps import parse_ts
+from .aux_data_record_builder import SealogInfluxAuxDataRecordBuilder, QUERY_LOOKBACK
+
+# Default number of samples kept per field
+DEFAULT_BUFFER_SIZE = 3600
+
+# Maximum size of a UDP datagram
+UDP_BUFFER_SIZE = 65535
+
+class FieldRingBuffer():
+    '''
+    Class that holds the last buffer_size (time, value) samples of a single
+    field.  Times are seconds since the epoch and must be appended in order.
+    Float values are stored as doubles, anything else is stored as an
+    object.
+    '''
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE, start_time=None):
+        self._size = max(1, buffer_size)
+        self._times = array('d', [0.0]) * self._size
+        self._values = array('d', [0.0]) * self._size
+        self._objects = {}
+        self._count = 0
+        self._head = 0
+        self._start_time = time.time() if start_time is None else start_time
+        self._lock = threading.Lock()
+
+    def append(self, sample_time, value):
+        '''
+        Add a sample, overwriting the oldest sample once the buffer is full.
+        '''
+
+        with self._lock:
+            idx = self._head
+
+            self._times[idx] = sample_time
+            if isinstance(value, float):
+                self._values[idx] = value
+                self._objects.pop(idx, None)
+            else:
+                self._objects[idx] = value
+
+            self._head = (idx + 1) % self._size
+            self._count = min(self._count + 1, self._size)
+
+    def _time_at(self, pos):
+        return self._times[(self._head - self._count + pos) % self._size]
+
+    def _value_at(self, pos):
+        idx = (self._head - self._count + pos) % self._size
+
+        if idx in self._objects:
+            return self._objects[idx]
+
+        return self._values[idx]
+
+    def lookup(self, lookup_time, lookback):
+        '''
+        Return (covered, value) where value is the latest value sampled in
+        the lookback seconds before lookup_time, or None.  covered is False
+        if samples in that window may have been evicted or were received
+        before the buffer was started, i.e. the answer is unknown.
+        '''
+
+        with self._lock:
+            # bisect for the first sample at or after lookup_time
+            lo, hi = 0, self._count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._time_at(mid) < lookup_time:
+                    lo = mid + 1
+                else:
+                    hi = mid
+
+            if lo > 0:
+                if self._time_at(lo - 1) >= lookup_time - lookback:
+                    return True, self._value_at(lo - 1)
+
+                return True, None
+
+            # no sample before lookup_time, the window is only known to be
+            # empty if nothing was evicted and the buffer was already running
+            if self._count < self._size and self._start_time <= lookup_time - lookback:
+                return True, None
+
+            return False, None
+
+    @property
+    def size(self):
+        '''
+        Getter method for the _size property
+        '''
+        return self._size
+
+    def __len__(self):
+        return self._count
+
+
+class SensorRingBuffers():
+    '''
+    Class that holds a FieldRingBuffer for each "<label>.<field>" of the
+    parsed sensor records.
+    '''
+
+    def __init__(self, buffer_size=DEFAULT_BUFFER_SIZE):
+        self._buffer_size = buffer_size
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self._start_time = time.time()
+
+    def _get_buffer(self, name):
+        field_buffer = self._buffers.get(name)
+
+        if field_buffer is None:
+            with self._lock:
+                field_buffer = self._buffers.setdefault(name, FieldRingBuffer(self._buffer_size, self._start_time))
+
+        return field_buffer
+
+    def add_record(self, record, sample_time=None):
+        '''
+        Add the values of a parsed sensor record, i.e. {'label': 'GGA', 'data':
+        {'latitude': ...}}.  sample_time defaults to the current time.
+        '''
+
+        sample_time = time.time() if sample_time is None else sample_time
+
+        for key, value in record['data'].items():
+            if value is not None:
+                self._get_buffer(record['label'] + '.' + key).append(sample_time, value)
+
+    def lookup(self, name, lookup_time, lookback):
+        '''
+        Return (covered, value) for the named field, see FieldRingBuffer.lookup.
+        '''
+
+        field_buffer = self._buffers.get(name)
+
+        if field_buffer is None:
+            return self._start_time <= lookup_time - lookback, None
+
+        return field_buffer.lookup(lookup_time, lookback)
+
+    @property
+    def names(self):
+        '''
+        The names of the buffered fields
+        '''
+        return list(self._buffers.keys())
+
+
+class UDPSensorListener():
+    '''
+    Class that receives sensor messages on a UDP port in a background thread,
+    parses them with parse_message and adds the resulting records to the
+    SensorRingBuffers.  Only one process receives the datagrams sent to a
+    port, so the listener needs its own port (i.e. a second copy of the feed
+    forwarded by the data acquisition system) and can not share the port of
+    cache_udp_data.py.
+    '''
+
+    def __init__(self, ring_buffers, parse_message, udp_port, udp_ip_address='0.0.0.0'):
+        self._ring_buffers = ring_buffers
+        self._parse_message = parse_message
+        self._address = (udp_ip_address, udp_port)
+        self._sock = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def _receive(self):
+
+        while not self._stopped.is_set():
+            try:
+                raw_bytes, _ = self._sock.recvfrom(UDP_BUFFER_SIZE)
+            except socket.timeout:
+                continue
+            except OSError as err:
+                if not self._stopped.is_set():
+                    logging.error("UDP sensor listener error: %s", str(err))
+                return
+
+            sample_time = time.time()
+
+            try:
+                record = self._parse_message(raw_bytes.decode('utf-8'))
+            except Exception as err:
+                logging.debug("Unable to parse message: %s", str(err))
+                continue
+
+            if record:
+                self._ring_buffers.add_record(record, sample_time)
+
+    def start(self):
+        '''
+        Open the UDP socket and start the receiving thread.
+        '''
+
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.settimeout(1)
+        self._sock.bind(self._address)
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+        logging.info("Listening for sensor data on UDP %s:%d", *self._address)
+
+    def stop(self):
+        '''
+        Stop the receiving thread and close the UDP socket.
+        '''
+
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def ring_buffers(self):
+        '''
+        Getter method for the _ring_buffers property
+        '''
+        return self._ring_buffers
+
+
+class SealogRingBufferAuxDataRecordBuilder(SealogInfluxAuxDataRecordBuilder):
+    '''
+    SealogInfluxAuxDataRecordBuilder that builds the aux_data records from
+    the SensorRingBuffers when they cover the event's ts and falls back to
+    the influxDB otherwise.  The aux_data_config's ring_buffer.fields maps
+    each aux_record_lookup field to a "<label>.<field>" ring buffer name.
+    '''
+
+    def __init__(self, influxdb_client, aux_data_config, ring_buffers):
+        super().__init__(influxdb_client, aux_data_config)
+        self._ring_buffers = ring_buffers
+        self._buffer_fields = aux_data_config.get('ring_buffer', {}).get('fields', {})
+        self._lookback = QUERY_LOOKBACK.total_seconds()
+
+        unmapped = [ field for field in self._query_fields if field not in self._buffer_fields ]
+        if unmapped:
+            logging.warning("No ring buffer fields defined for %s in data_source %s, using InfluxDB", ', '.join(unmapped), self._datasource)
+            self._buffer_fields = None
+
+    def build_buffered_aux_data_record(self, event):
+        '''
+        Build the aux_data record for the given event from the ring buffers.
+        Returns (covered, aux_data_record) where covered is False if the
+        ring buffers do not cover the event's ts or have no value for one of
+        the fields and the influxDB has to be queried instead.
+        '''
+
+        if self._buffer_fields is None:
+            return False, None
+
+        try:
+            lookup_time = parse_ts(event['ts']).replace(tzinfo=timezone.utc).timestamp()
+        except Exception as err:
+            logging.debug(str(err))
+            return False, None
+
+        influx_data = {}
+
+        for field, name in self._buffer_fields.items():
+            covered, value = self._ring_buffers.lookup(name, lookup_time, self._lookback)
+
+            if not covered:
+                logging.debug("Ring buffer %s does not cover %s", name, event['ts'])
+                return False, None
+
+            if value is None:
+                logging.debug("Ring buffer %s has no value for %s", name, event['ts'])
+                return False, None
+
+            influx_data[field] = value
+
+        return True, self.build_aux_data_record_from_values(event['id'], influx_data)
+
+    def build_aux_data_record(self, event):
+        '''
+        Build the aux_data record for the given event from the ring buffers,
+        or the influxDB if the ring buffers do not cover the event's ts.
+        '''
+
+        covered, aux_data_record = self.build_buffered_aux_data_record(event)
+
+        if covered:
+            return aux_data_record
+
+        return super().build_aux_data_record(event)
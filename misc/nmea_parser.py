@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+'''
+FILE:           nmea_parser.py
+
+DESCRIPTION:    This script contains the functions used to parse the sensor
+                messages received over UDP by cache_udp_data.py and the
+                sealog_aux_data_inserter_influx.py ring buffer backend.
+
+BUGS:
+NOTES:      Parsers are registered by sentence ID (the last 3 characters of
+            the address field, i.e. GGA for both "GGA" and "$GPGGA") in
+            PARSERS and the records are labelled with the sentence ID unless
+            a label is given, so "$GPGGA" and "$INGGA" messages both update
+            the GGA record.  The VTG, HDT, ZDA and DBT parsers are driven by
+            the field maps in FIELD_MAPS.  parse_messages converts the
+            coordinates of a batch of messages in one pass, using numpy if
+            it is installed.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import logging
+import datetime
+from functools import reduce
+from operator import xor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from python_sealog.timestamps import to_ts_string
+
+# Sign of the coordinate for each hemisphere
+HEMISPHERE_SIGNS = {'N': 1, 'n': 1, 'E': 1, 'e': 1, 'S': -1, 's': -1, 'W': -1, 'w': -1}
+
+# Number of degree digits of the coordinate for each hemisphere
+HEMISPHERE_DEGREE_DIGITS = {'N': 2, 'n': 2, 'S': 2, 's': 2, 'E': 3, 'e': 3, 'W': 3, 'w': 3}
+
+# Drop messages with an invalid "*hh" checksum, messages without a checksum
+# are always accepted
+VALIDATE_CHECKSUM = True
+
+def _to_float(value):
+    '''
+    Convert the field to a float, empty fields are None
+    '''
+
+    return float(value) if value else None
+
+
+def _to_int(value):
+    '''
+    Convert the field to an int, empty fields are None
+    '''
+
+    return int(value) if value else None
+
+
+def _convert_zda_time(fields):
+    '''
+    Convert the ZDA hhmmss.ss, day, month and year fields to a timestamp
+    '''
+
+    seconds = float(fields[1][4:])
+
+    return to_ts_string(datetime.datetime(int(fields[4]), int(fields[3]), int(fields[2]),
+                                          int(fields[1][:2]), int(fields[1][2:4]), int(seconds),
+                                          int(round((seconds % 1) * 1000000))))
+
+
+# Output field, message field index and converter of each sentence parsed
+# by _parse_fields.  Converters without an index are called with all of the
+# message fields, missing fields are None.
+FIELD_MAPS = {
+    'VTG': [
+        ('course_true', 1, _to_float),
+        ('course_magnetic', 3, _to_float),
+        ('speed_knots', 5, _to_float),
+        ('speed_kph', 7, _to_float)
+    ],
+    'HDT': [
+        ('heading', 1, _to_float)
+    ],
+    'ZDA': [
+        ('utc_time', None, _convert_zda_time),
+        ('local_zone_hours', 5, _to_int),
+        ('local_zone_minutes', 6, _to_int)
+    ],
+    'DBT': [
+        ('depth_feet', 1, _to_float),
+        ('depth_meters', 3, _to_float),
+        ('depth_fathoms', 5, _to_float)
+    ]
+}
+
+
+def _convert_ll(value, hemisphere):
+    '''
+    Convert the gga-style [d]ddmm.mmmm value and hemisphere to ddeg
+    '''
+
+    digits = HEMISPHERE_DEGREE_DIGITS[hemisphere]
+    return round((int(value[:digits]) + float(value[digits:]) / 60) * HEMISPHERE_SIGNS[hemisphere], 6)
+
+
+def _convert_gga_ll(value, hemisphere):
+    '''
+    Convert the gga-style coordinate and hemisphere to ddeg
+    '''
+
+    try:
+        return _convert_ll(value, hemisphere)
+
+    except Exception as err:
+        logging.error("Unable to convert position: %s %s", value, hemisphere)
+        logging.debug(str(err))
+
+    return None
+
+
+def convert_coordinates(values, hemispheres):
+    '''
+    Convert lists of gga-style coordinates and hemispheres to ddeg in one
+    pass.  Returns the list of coordinates, None for the entries that could
+    not be converted.  The results are the same as calling _convert_gga_ll
+    for each coordinate, which is what happens without numpy.
+    '''
+
+    if numpy is None:
+        return list(map(_convert_gga_ll, values, hemispheres))
+
+    degrees = []
+    minutes = []
+    signs = []
+    valid = []
+
+    for value, hemisphere in zip(values, hemispheres):
+        try:
+            digits = HEMISPHERE_DEGREE_DIGITS[hemisphere]
+            degrees.append(int(value[:digits]))
+            minutes.append(float(value[digits:]))
+            signs.append(HEMISPHERE_SIGNS[hemisphere])
+            valid.append(True)
+
+        except Exception as err:
+            logging.error("Unable to convert position: %s %s", value, hemisphere)
+            logging.debug(str(err))
+            degrees.append(0)
+            minutes.append(0.0)
+            signs.append(0)
+            valid.append(False)
+
+    # same arithmetic as _convert_ll, round() is applied to the python floats
+    # so the results match it exactly
+    coordinates = (numpy.array(degrees) + numpy.array(minutes) / 60) * numpy.array(signs)
+
+    return [ round(coordinate, 6) if is_valid else None for coordinate, is_valid in zip(coordinates.tolist(), valid) ]
+
+
+def validate_checksum(message):
+    '''
+    Return True if the "*hh" checksum of the message matches the XOR of the
+    characters between the leading $ (or !) and the *.
+    '''
+
+    body, _, checksum = message.rpartition('*')
+
+    try:
+        return reduce(xor, body.lstrip('$!').encode('ascii'), 0) == int(checksum[:2], 16)
+    except ValueError:
+        return False
+
+
+def split_message(message, check=VALIDATE_CHECKSUM):
+    '''
+    Strip the checksum and split the message into its fields.  Returns None
+    if the checksum is invalid.
+    '''
+
+    message = message.rstrip()
+
+    if '*' in message:
+        if check and not validate_checksum(message):
+            logging.warning("Invalid checksum: %s", message)
+            return None
+
+        message = message[:message.rindex('*')]
+
+    return message.split(',')
+
+
+def get_sentence_id(address):
+    '''
+    Return the sentence ID of the message address field, i.e. GGA for
+    "$GPGGA" or "GGA".
+    '''
+
+    address = address.lstrip('$!')
+    return address[-3:] if len(address) > 3 else address
+
+
+def _parse_gga_fields(fields, label, updated, coordinates=None):
+    '''
+    Build the GGA record from the message fields.  The coordinates are
+    converted unless the (latitude, longitude) are already given.
+    '''
+
+    if coordinates is None:
+        coordinates = (_convert_gga_ll(fields[2], fields[3]), _convert_gga_ll(fields[4], fields[5]))
+
+    return {
+        "label": label,
+        "updated": updated,
+        "data": {
+            "latitude": coordinates[0],
+            "longitude": coordinates[1],
+            "depth": float(fields[9]) * -1
+        }
+    }
+
+
+def _parse_fields(fields, label, updated):
+    '''
+    Build the record from the message fields using the FIELD_MAPS entry of
+    the sentence.
+    '''
+
+    field_map = FIELD_MAPS[get_sentence_id(fields[0])]
+
+    return {
+        "label": label,
+        "updated": updated,
+        "data": { name: converter(fields) if idx is None else converter(fields[idx]) if idx < len(fields) else None for name, idx, converter in field_map }
+    }
+
+
+# Parser of each sentence ID, called with the message fields, label and
+# updated time
+PARSERS = {
+    'GGA': _parse_gga_fields,
+    'VTG': _parse_fields,
+    'HDT': _parse_fields,
+    'ZDA': _parse_fields,
+    'DBT': _parse_fields
+}
+
+# Valid line headers to process
+VALID_LINE_LABELS = list(PARSERS.keys())
+
+def register_parser(sentence_id, parser=None, field_map=None):
+    '''
+    Register the parser for the sentence ID.  parser is called with the
+    message fields, label and updated time and must return the record.
+    Alternatively a FIELD_MAPS style field_map can be given.
+    '''
+
+    if field_map is not None:
+        FIELD_MAPS[sentence_id] = field_map
+        parser = _parse_fields
+
+    if parser is None:
+        raise ValueError("Either a parser or a field_map is required")
+
+    PARSERS[sentence_id] = parser
+
+    if sentence_id not in VALID_LINE_LABELS:
+        VALID_LINE_LABELS.append(sentence_id)
+
+
+def _parse_split_message(fields, message, label=None, updated=None):
+
+    try:
+        parser = PARSERS[get_sentence_id(fields[0])]
+        return parser(fields, label or get_sentence_id(fields[0]), updated or datetime.datetime.utcnow())
+
+    except Exception as err:
+        logging.warning("Error parsing message: %s", message)
+        logging.debug(str(err))
+
+    return None
+
+
+def parse_gga(message, label=None):
+    '''
+    Parse the GGA message
+    '''
+
+    fields = split_message(message)
+
+    if fields is None:
+        return None
+
+    try:
+        return _parse_gga_fields(fields, label or get_sentence_id(fields[0]), datetime.datetime.utcnow())
+
+    except Exception as err:
+        logging.warning("Error parsing message: %s", message)
+        logging.debug(str(err))
+
+    return None
+
+
+def get_message_type(message):
+    '''
+    Return the sentence ID of the message if there is a parser registered
+    for it or None.
+    '''
+
+    sentence_id = get_sentence_id(message.split(',', 1)[0])
+
+    return sentence_id if sentence_id in PARSERS else None
+
+
+def parse_message(message, check=VALIDATE_CHECKSUM):
+    '''
+    Parse the message if there is a parser registered for its sentence ID.
+    Returns the record or None if the message could not be parsed.
+    '''
+
+    fields = split_message(message, check)
+
+    if fields is None or get_sentence_id(fields[0]) not in PARSERS:
+        return None
+
+    return _parse_split_message(fields, message)
+
+
+def parse_messages(messages, check=VALIDATE_CHECKSUM):
+    '''
+    Parse a batch of messages, i.e. the lines of a recorded log.  The GGA
+    coordinates of the whole batch are converted in one convert_coordinates
+    pass.  Returns the list of records, None for the messages that could not
+    be parsed.
+    '''
+
+    updated = datetime.datetime.utcnow()
+    records = [None] * len(messages)
+    gga_messages = []
+
+    for idx, message in enumerate(messages):
+        fields = split_message(message, check)
+
+        if fields is None:
+            continue
+
+        sentence_id = get_sentence_id(fields[0])
+
+        if sentence_id not in PARSERS:
+            continue
+
+        if sentence_id == 'GGA' and PARSERS['GGA'] is _parse_gga_fields and len(fields) > 9:
+            gga_messages.append((idx, fields))
+            continue
+
+        records[idx] = _parse_split_message(fields, message, updated=updated)
+
+    if gga_messages:
+        latitudes = convert_coordinates([ fields[2] for _, fields in gga_messages ], [ fields[3] for _, fields in gga_messages ])
+        longitudes = convert_coordinates([ fields[4] for _, fields in gga_messages ], [ fields[5] for _, fields in gga_messages ])
+
+        for (idx, fields), latitude, longitude in zip(gga_messages, latitudes, longitudes):
+            try:
+                records[idx] = _parse_gga_fields(fields, get_sentence_id(fields[0]), updated, (latitude, longitude))
+            except Exception as err:
+                logging.warning("Error parsing message: %s", messages[idx])
+                logging.debug(str(err))
+
+    return records
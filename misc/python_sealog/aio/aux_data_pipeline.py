@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+'''
+FILE:           aux_data_pipeline.py
+
+DESCRIPTION:    This script contains the AuxDataPipeline class used by the aux
+                data inserter services to build and submit aux_data records
+                in a pool of asyncio workers while the websocket reader keeps
+                receiving events.
+
+BUGS:
+NOTES:      The record builders are usually blocking (i.e. database queries)
+            so they are run in the event loop's default executor.  The
+            records are submitted over the shared AsyncSealogClient session.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+from .event_aux_data import create_event_aux_data
+
+# Default number of events built/submitted at the same time
+DEFAULT_WORKERS = 4
+
+# Default maximum number of events waiting to be built
+DEFAULT_QUEUE_SIZE = 100
+
+# What to do when an event arrives and the queue is full:
+#   block       - wait for space, delaying the websocket reader
+#   drop_oldest - discard the oldest queued event
+#   drop_newest - discard the new event
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+DEFAULT_OVERFLOW_POLICY = 'block'
+
+# Number of recent events the latency statistics are calculated from
+LATENCY_WINDOW = 1000
+
+# How often, in seconds, the metrics are logged, 0 to disable
+DEFAULT_METRICS_INTERVAL = 60
+
+class PipelineMetrics():
+    '''
+    Class that holds the counters and latency samples of an AuxDataPipeline.
+    Latencies are in seconds, measured from when the event was received to
+    when its records were submitted.
+    '''
+
+    def __init__(self):
+        self.received = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.records_submitted = 0
+        self.records_failed = 0
+        self.max_queue_depth = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._queue_waits = deque(maxlen=LATENCY_WINDOW)
+
+    def add_latency(self, latency, queue_wait):
+        '''
+        Record the end-to-end latency and queue wait of a completed event.
+        '''
+
+        self._latencies.append(latency)
+        self._queue_waits.append(queue_wait)
+
+    @staticmethod
+    def _percentile(samples, percentile):
+        if not samples:
+            return None
+
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def as_dict(self, queue_depth=0):
+        '''
+        Return a snapshot of the metrics as a dict.
+        '''
+
+        latencies = list(self._latencies)
+        queue_waits = list(self._queue_waits)
+
+        return {
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'received': self.received,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'records_submitted': self.records_submitted,
+            'records_failed': self.records_failed,
+            'latency_mean': sum(latencies) / len(latencies) if latencies else None,
+            'latency_p50': self._percentile(latencies, 0.5),
+            'latency_p95': self._percentile(latencies, 0.95),
+            'latency_max': max(latencies) if latencies else None,
+            'queue_wait_mean': sum(queue_waits) / len(queue_waits) if queue_waits else None
+        }
+
+
+class AuxDataPipeline():
+    '''
+    Class that queues the events received by an aux data inserter and builds
+    and submits their aux_data records in a pool of workers.  build_records
+    is called with each event and must return a list of aux_data records
+    (None entries are skipped), it can be a coroutine function or a blocking
+    function, the latter is run in the default executor.  overflow_policy is
+    one of OVERFLOW_POLICIES.
+    '''
+
+    def __init__(self, build_records, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, overflow_policy=DEFAULT_OVERFLOW_POLICY, metrics_interval=DEFAULT_METRICS_INTERVAL): # pylint: disable=too-many-arguments
+
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError("overflow_policy must be one of: " + ', '.join(OVERFLOW_POLICIES))
+
+        self._build_records = build_records
+        self._workers = max(1, workers)
+        self._queue_size = max(1, queue_size)
+        self._overflow_policy = overflow_policy
+        self._metrics_interval = metrics_interval
+        self._metrics = PipelineMetrics()
+        self._queue = None
+        self._tasks = []
+
+    async def _build(self, event):
+        if asyncio.iscoroutinefunction(self._build_records):
+            return await self._build_records(event)
+
+        return await asyncio.get_running_loop().run_in_executor(None, self._build_records, event)
+
+    async def _submit(self, record):
+
+        try:
+            logging.debug("Submitting aux data record to Sealog Server")
+            if not await create_event_aux_data(record):
+                raise ValueError("Record not accepted by the server")
+
+            self._metrics.records_submitted += 1
+
+        except Exception as err:
+            self._metrics.records_failed += 1
+            logging.warning("Error submitting %s aux data record for event: %s", record['data_source'], record['event_id'])
+            logging.debug(str(err))
+
+    async def _process(self, event):
+        '''
+        Build the aux_data records for a single event and submit them
+        together.
+        '''
+
+        records = [ record for record in await self._build(event) or [] if record ]
+
+        await asyncio.gather(*[ self._submit(record) for record in records ])
+
+    async def _worker(self):
+
+        while True:
+            received, event = await self._queue.get()
+            started = time.monotonic()
+
+            try:
+                await self._process(event)
+                self._metrics.completed += 1
+                self._metrics.add_latency(time.monotonic() - received, started - received)
+
+            except Exception as err:
+                self._metrics.failed += 1
+                logging.error("Error building aux data for event: %s", event.get('id'))
+                logging.debug(str(err))
+
+            finally:
+                self._queue.task_done()
+
+    async def _report_metrics(self):
+
+        while True:
+            await asyncio.sleep(self._metrics_interval)
+            logging.info("Aux data pipeline: %s", self.metrics)
+
+    async def start(self):
+        '''
+        Start the workers.
+        '''
+
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._tasks = [ asyncio.ensure_future(self._worker()) for _ in range(self._workers) ]
+
+        if self._metrics_interval > 0:
+            self._tasks.append(asyncio.ensure_future(self._report_metrics()))
+
+    async def put(self, event):
+        '''
+        Queue an event, applying the overflow_policy if the queue is full.
+        Returns False if an event was dropped.
+        '''
+
+        self._metrics.received += 1
+        item = (time.monotonic(), event)
+        accepted = True
+
+        if self._queue.full() and self._overflow_policy != 'block':
+            self._metrics.dropped += 1
+            accepted = False
+
+            if self._overflow_policy == 'drop_newest':
+                logging.warning("Aux data queue full, dropping event: %s", event.get('id'))
+                return accepted
+
+            _, dropped_event = self._queue.get_nowait()
+            self._queue.task_done()
+            logging.warning("Aux data queue full, dropping event: %s", dropped_event.get('id'))
+
+        await self._queue.put(item)
+        self._metrics.max_queue_depth = max(self._metrics.max_queue_depth, self._queue.qsize())
+
+        return accepted
+
+    async def stop(self, drain=True, timeout=None):
+        '''
+        Stop the workers.  If drain is True the queued events are processed
+        first, for at most timeout seconds.
+        '''
+
+        if drain and self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Aux data queue not drained, %d event(s) discarded", self._queue.qsize())
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        logging.info("Aux data pipeline stopped: %s", self.metrics)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, *args):
+        # don't wait on a broken connection longer than it takes to flush
+        await self.stop(drain=True, timeout=None if exc_type is None else 10)
+
+    @property
+    def queue_depth(self):
+        '''
+        Number of events waiting to be built
+        '''
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def metrics(self):
+        '''
+        Snapshot of the pipeline metrics as a dict
+        '''
+        return self._metrics.as_dict(self.queue_depth)
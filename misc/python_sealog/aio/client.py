@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+'''
+FILE:           client.py
+
+DESCRIPTION:    This script contains the AsyncSealogClient class used by the
+                asyncio wrapper functions to communicate with the sealog-server
+                API over a single pooled aiohttp session.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import asyncio
+import logging
+from collections import namedtuple
+import aiohttp
+
+from ..client import DEFAULT_POOL_SIZE, DEFAULT_MAX_RETRIES, DEFAULT_BACKOFF_FACTOR, DEFAULT_RETRY_STATUSES, DEFAULT_TIMEOUT, RETRY_METHODS
+from ..settings import HEADERS
+
+# The response body is read before the connection is returned to the pool so
+# the wrapper functions can use status_code/text just like a requests response.
+SealogResponse = namedtuple('SealogResponse', ['status_code', 'text'])
+
+class AsyncSealogClient():
+    '''
+    Class that owns a pooled aiohttp.ClientSession used to submit requests to
+    the sealog-server API from within an asyncio event loop.
+    '''
+
+    def __init__(self, headers=None, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT): # pylint: disable=too-many-arguments
+        self._headers = headers if headers is not None else HEADERS
+        self._pool_size = pool_size
+        self._max_retries = max_retries
+        self._backoff_factor = backoff_factor
+        self._timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        self._session = None
+        self._loop = None
+
+    def _get_session(self):
+        '''
+        Return the pooled session, creating it if it does not exist yet or if
+        it belongs to a different event loop.
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self._pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+            self._loop = loop
+
+        return self._session
+
+    async def request(self, method, url, headers=None, **kwargs):
+        '''
+        Submit a request to the given url using the pooled session.  If
+        headers is not defined the client's default headers are used.
+        Idempotent requests are retried on connection errors and on the
+        DEFAULT_RETRY_STATUSES status codes.
+        '''
+
+        headers = headers if headers is not None else self._headers
+        retries = self._max_retries if method in RETRY_METHODS else 0
+
+        attempt = 0
+        while True:
+            logging.debug("%s %s", method, url)
+            try:
+                async with self._get_session().request(method, url, headers=headers, **kwargs) as resp:
+                    text = await resp.text()
+
+                if resp.status not in DEFAULT_RETRY_STATUSES or attempt >= retries:
+                    return SealogResponse(resp.status, text)
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                if attempt >= retries:
+                    raise err
+
+                logging.debug(str(err))
+
+            attempt += 1
+            await asyncio.sleep(self._backoff_factor * (2 ** (attempt - 1)))
+
+    async def get(self, url, headers=None, **kwargs):
+        '''
+        Submit a GET request to the given url.
+        '''
+
+        return await self.request('GET', url, headers=headers, **kwargs)
+
+    async def post(self, url, headers=None, **kwargs):
+        '''
+        Submit a POST request to the given url.
+        '''
+
+        return await self.request('POST', url, headers=headers, **kwargs)
+
+    async def patch(self, url, headers=None, **kwargs):
+        '''
+        Submit a PATCH request to the given url.
+        '''
+
+        return await self.request('PATCH', url, headers=headers, **kwargs)
+
+    async def delete(self, url, headers=None, **kwargs):
+        '''
+        Submit a DELETE request to the given url.
+        '''
+
+        return await self.request('DELETE', url, headers=headers, **kwargs)
+
+    async def close(self):
+        '''
+        Close the pooled session and all of its connections.
+        '''
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def headers(self):
+        '''
+        Getter method for the _headers property
+        '''
+        return self._headers
+
+
+_DEFAULT_CLIENT = None
+
+def get_default_client():
+    '''
+    Return the shared AsyncSealogClient instance used by the asyncio wrapper
+    functions, creating it on first use.
+    '''
+
+    global _DEFAULT_CLIENT # pylint: disable=global-statement
+
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = AsyncSealogClient()
+
+    return _DEFAULT_CLIENT
+
+
+def set_default_client(client):
+    '''
+    Replace the shared AsyncSealogClient instance used by the asyncio wrapper
+    functions.  Returns the previous instance.
+    '''
+
+    global _DEFAULT_CLIENT # pylint: disable=global-statement
+
+    previous_client = _DEFAULT_CLIENT
+    _DEFAULT_CLIENT = client
+
+    return previous_client
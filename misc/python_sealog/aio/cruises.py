@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+'''
+FILE:           cruises.py
+
+DESCRIPTION:    This script contains the asyncio wrapper functions for the
+                sealog-server cruise routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import logging
+
+from .client import get_default_client
+from ..settings import API_SERVER_URL, HEADERS, CRUISES_API_PATH
+
+async def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return a cruise record based on the cruise_id.  Returns the record as a json
+    object by default.  Set export_format to 'csv' to return the record in csv
+    format.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '/' + cruise_uid + '?format=' + export_format
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+        else:
+            return None
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def get_cruises(export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return all cruise records.  Returns the records as json objects by default
+    Set export_format to 'csv' to return the records in csv format.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '?format=' + export_format
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+
+        if req.status_code == 404:
+            if export_format == 'json':
+                return []
+
+            if export_format == 'csv':
+                return ""
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def get_cruise_uid_by_id(cruise_id, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the UID for a cruise record based on the cruise_id.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '?cruise_id=' + cruise_id
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            cruise = json.loads(req.text)[0]
+
+            return cruise['id']
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def get_cruise_by_id(cruise_id, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the cruise record based on the cruise_id.  Returns the records as json
+    object by default.  Set export_format to 'csv' to return the record in csv
+    format.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '?cruise_id=' + cruise_id + '&format=' + export_format
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)[0]
+
+            if export_format == 'csv':
+                return req.text
+        else:
+            return None
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def get_cruise_by_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the cruise record that contains the lowering whose uid is
+    lowering_uid.  Returns the record as a json object by default.  Set
+    export_format to 'csv' to return the record in csv format.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '/bylowering/' + lowering_uid + '?format=' + export_format
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+        else:
+            return None
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def get_cruise_by_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the cruise record that contains the event whose uid is
+    event_uid.  Returns the record as a json object by default.  Set
+    export_format to 'csv' to return the record in csv format.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '/byevent/' + event_uid + '?format=' + export_format
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            if export_format == 'json':
+                return json.loads(req.text)
+
+            if export_format == 'csv':
+                return req.text
+        else:
+            return None
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+async def create_cruise(cruise_record, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit a new cruise record.  Returns the server response as a json object
+    if the cruise was created, otherwise returns None.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH
+        req = await get_default_client().post(url, headers=headers, data = json.dumps(cruise_record))
+        logging.debug(req.text)
+
+        if req.status_code == 201:
+            return json.loads(req.text)
+
+    except Exception as error:
+        logging.error('Error creating cruise record')
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+async def update_cruise(cruise_uid, payload, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Update the cruise record whose uid is cruise_uid with the contents of
+    payload.  Returns True if the update was successful.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '/' + cruise_uid
+        req = await get_default_client().patch(url, headers=headers, data = json.dumps(payload))
+        logging.debug(req.text)
+
+        return req.status_code == 204
+
+    except Exception as error:
+        logging.error('Error updating cruise record')
+        logging.debug(str(error))
+        raise error
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_aux_data.py
+
+DESCRIPTION:    This script contains the asyncio wrapper functions for the
+                sealog-server event_aux_data routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import logging
+
+from .client import get_default_client
+from ..settings import API_SERVER_URL, HEADERS, EVENT_AUX_DATA_API_PATH
+
+async def get_event_aux_data_by_cruise(cruise_uid, datasource=None, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the aux_data records for the given cruise_uid and optional
+    datasource.
+    '''
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
+
+        if datasource is not None:
+            url += '&datasource=' + datasource
+
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code != 404:
+            event_aux_data = json.loads(req.text)
+            logging.debug(json.dumps(event_aux_data))
+            return event_aux_data
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+async def get_event_aux_data_by_lowering(lowering_uid, datasource='', limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the aux_data records for the given lowering_uid and optional
+    datasource.
+    '''
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid
+
+
+        querystring = []
+
+        if datasource != '':
+            querystring.append('datasource=' + datasource)
+
+        if limit > 0:
+            querystring.append('limit=' + str(limit))
+
+        if len(querystring) > 0:
+            url += '?' + '&'.join(querystring)
+
+        logging.info(url)
+
+        req = await get_default_client().get(url, headers=headers)
+
+        event_aux_data = json.loads(req.text)
+        logging.debug(json.dumps(event_aux_data))
+        return event_aux_data
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+
+async def create_event_aux_data(aux_data_record, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit an aux_data record.  If an aux_data record already exists for the
+    same event_id and data_source it will be updated.  Returns True if the
+    record was inserted or updated, otherwise returns False.
+    '''
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH
+        req = await get_default_client().post(url, headers=headers, data = json.dumps(aux_data_record))
+        logging.debug("Response: %s", req.text)
+
+        return req.status_code in (201, 204)
+
+    except Exception as error:
+        logging.error('Error submitting aux_data record')
+        logging.debug(str(error))
+        raise error
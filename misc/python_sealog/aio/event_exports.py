@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_export.py
+
+DESCRIPTION:    This script contains the asyncio wrapper functions for the
+                sealog-server event_export routes.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import logging
+
+from .client import get_default_client
+from ..settings import API_SERVER_URL, HEADERS, EVENT_EXPORTS_API_PATH
+
+
+async def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event_exports for the cruise with the given cruise_uid.  Returns
+    the records as an array of json objects by default.  Set export_format to
+    'csv' to return the records in csv format.  Optionally set a event_filter
+    that will limit the returns to on the events that match the event_filter.
+    '''
+
+    try:
+        url = api_server_url + EVENT_EXPORTS_API_PATH + '/bycruise/' + cruise_uid + '?format=' + export_format
+
+        if event_filter != '':
+            url += '&value=' + event_filter
+
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code != 404:
+
+            if export_format == 'json':
+                events = json.loads(req.text)
+                return events
+
+            return req.text
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+async def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the event_exports for the lowering with the given lowering_uid.
+    Returns the records as an array of json objects by default.  Set
+    export_format to 'csv' to return the records in csv format.  Optionally set
+    a event_filter that will limit the returns to on the events that match the
+    event_filter.
+    '''
+
+    try:
+        url = api_server_url + EVENT_EXPORTS_API_PATH + '/bylowering/' + lowering_uid + '?format=' + export_format
+
+        if event_filter != '':
+            url += '&value=' + event_filter
+
+        req = await get_default_client().get(url, headers=headers)
+
+        if req.status_code != 404:
+
+            if export_format == 'json':
+                events = json.loads(req.text)
+                return events
+
+            return req.text
+
+    except Exception as error:
+        logging.debug(str(error))
+        raise error
+
+    return None
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_repeater.py
+
+DESCRIPTION:    This script contains the EventRepeater class used by the
+                sealog_repeater_transmit.py and sealog_repeater_receive.py
+                services to store-and-forward the events published by one
+                sealog-server to another over a slow or intermittent link.
+
+BUGS:
+NOTES:      Events received over the websocket are written to an EventSpool
+            before they are forwarded, so nothing is lost while the
+            destination is unreachable or the repeater is restarted.  The
+            spooled events are submitted in batches of concurrent requests
+            over the shared AsyncSealogClient session and, optionally, gzip
+            compressed.  An event is acknowledged once the destination has
+            created it or reports it as a duplicate.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import gzip
+import json
+import asyncio
+import logging
+import websockets
+
+from .client import get_default_client
+from ..settings import EVENTS_API_PATH
+
+# Maximum number of events submitted at the same time
+DEFAULT_BATCH_SIZE = 50
+
+# Seconds to wait before retrying after the destination was unreachable,
+# doubled after every failed attempt up to MAX_RETRY_INTERVAL
+DEFAULT_RETRY_INTERVAL = 5
+MAX_RETRY_INTERVAL = 300
+
+# How often, in seconds, the acknowledged events are purged from the spool
+# and the metrics are logged
+PURGE_INTERVAL = 3600
+
+# Results of submitting an event
+ACCEPTED = 'accepted'
+REJECTED = 'rejected'
+FAILED = 'failed'
+
+class EventRepeater():
+    '''
+    Class that spools events and forwards them to the sealog-server at
+    api_server_url.  Events rejected by the destination (other than as
+    duplicates) are logged and skipped so they do not block the backlog.
+    '''
+
+    def __init__(self, spool, api_server_url, headers, batch_size=DEFAULT_BATCH_SIZE, compress=False, retry_interval=DEFAULT_RETRY_INTERVAL): # pylint: disable=too-many-arguments
+        self._spool = spool
+        self._url = api_server_url + EVENTS_API_PATH
+        self._headers = dict(headers, **{'Content-Type': 'application/json'})
+        self._batch_size = max(1, batch_size)
+        self._compress = compress
+        self._retry_interval = retry_interval
+        self._wakeup = asyncio.Event()
+        self.forwarded = 0
+        self.rejected = 0
+
+        if compress:
+            self._headers['Content-Encoding'] = 'gzip'
+
+    def add(self, event):
+        '''
+        Spool the event and wake up the forwarder.
+        '''
+
+        if self._spool.append(event) is None:
+            logging.debug("Event already spooled: %s", event.get('id'))
+            return
+
+        self._wakeup.set()
+
+    async def _submit(self, event):
+        '''
+        Submit a single event.  Returns ACCEPTED, REJECTED or FAILED.
+        '''
+
+        data = json.dumps(event).encode('utf-8')
+
+        if self._compress:
+            data = gzip.compress(data)
+
+        try:
+            req = await get_default_client().post(self._url, headers=self._headers, data=data)
+
+        except Exception as error:
+            logging.debug(str(error))
+            return FAILED
+
+        if req.status_code == 201:
+            return ACCEPTED
+
+        if req.status_code == 400 and 'duplicate event ID' in req.text:
+            logging.debug("Event already forwarded: %s", event.get('id'))
+            return ACCEPTED
+
+        if 400 <= req.status_code < 500 and req.status_code not in (401, 403, 408, 429):
+            logging.error("Event %s rejected by the destination: %s", event.get('id'), req.text)
+            return REJECTED
+
+        logging.debug("Unable to forward event %s: %d %s", event.get('id'), req.status_code, req.text)
+        return FAILED
+
+    async def forward_batch(self):
+        '''
+        Submit the next batch of spooled events and acknowledge the events up
+        to the first one that failed.  Returns the number of events
+        acknowledged and whether the whole batch succeeded.
+        '''
+
+        batch = self._spool.pending(self._batch_size)
+
+        if not batch:
+            return 0, True
+
+        results = await asyncio.gather(*[ self._submit(event) for _, event in batch ])
+
+        acked = 0
+        for (seq, _), result in zip(batch, results):
+            if result == FAILED:
+                break
+
+            if result == REJECTED:
+                self.rejected += 1
+            else:
+                self.forwarded += 1
+
+            acked += 1
+            self._spool.ack(seq)
+
+        return acked, acked == len(batch)
+
+    async def forward(self):
+        '''
+        Forward the spooled events until cancelled.  The backlog is replayed
+        in back-to-back batches, after a failure the forwarder waits for the
+        retry interval before trying again.
+        '''
+
+        retry_interval = self._retry_interval
+
+        while True:
+            self._wakeup.clear()
+            acked, complete = await self.forward_batch()
+
+            if acked:
+                logging.info("Forwarded %d event(s), %d waiting", acked, self._spool.backlog)
+
+            if complete:
+                retry_interval = self._retry_interval
+
+                if acked:
+                    continue
+
+                await self._wakeup.wait()
+                continue
+
+            logging.warning("Destination unreachable, %d event(s) waiting, retrying in %s seconds", self._spool.backlog, retry_interval)
+
+            # new events do not cut the wait short, they are sent with the backlog
+            await asyncio.sleep(retry_interval)
+            retry_interval = min(retry_interval * 2, MAX_RETRY_INTERVAL)
+
+    async def housekeeping(self):
+        '''
+        Purge the acknowledged events from the spool and log the metrics
+        every PURGE_INTERVAL seconds until cancelled.
+        '''
+
+        while True:
+            await asyncio.sleep(PURGE_INTERVAL)
+            purged = self._spool.purge()
+            logging.info("Repeater: %d forwarded, %d rejected, %d waiting, %d purged from the spool", self.forwarded, self.rejected, self._spool.backlog, purged)
+
+    async def receive(self, ws_server_url, hello, ping):
+        '''
+        Connect to the websocket at ws_server_url and spool the published
+        events until the connection is closed.
+        '''
+
+        async with websockets.connect(ws_server_url) as websocket:
+
+            await websocket.send(json.dumps(hello))
+
+            while True:
+
+                event = await websocket.recv()
+                event_obj = json.loads(event)
+
+                if event_obj['type'] and event_obj['type'] == 'ping':
+                    await websocket.send(json.dumps(ping))
+
+                elif event_obj['type'] and event_obj['type'] == 'pub':
+                    logging.debug("Event received: %s", event_obj['message'].get('id'))
+                    self.add(event_obj['message'])
+
+    async def run(self, ws_server_url, hello, ping, reconnect_interval=DEFAULT_RETRY_INTERVAL):
+        '''
+        Receive, spool and forward events until cancelled, reconnecting to the
+        websocket every reconnect_interval seconds when the connection is
+        lost.  The forwarder keeps replaying the spool while disconnected.
+        '''
+
+        tasks = [ asyncio.ensure_future(self.forward()), asyncio.ensure_future(self.housekeeping()) ]
+
+        try:
+            while True:
+                try:
+                    logging.debug("Connecting to event websocket feed...")
+                    await self.receive(ws_server_url, hello, ping)
+
+                except Exception as error:
+                    logging.error("Lost connection to the websocket, trying again in %s seconds", reconnect_interval)
+                    logging.debug(str(error))
+
+                await asyncio.sleep(reconnect_interval)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await get_default_client().close()
+
+    @property
+    def spool(self):
+        '''
+        Getter method for the _spool property
+        '''
+        return self._spool
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+'''
+FILE:           client.py
+
+DESCRIPTION:    This script contains the SealogClient class used by the
+                wrapper functions to communicate with the sealog-server API
+                over a pooled, keep-alive HTTP session.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .settings import HEADERS
+
+# Maximum number of pooled connections kept open to the sealog-server
+DEFAULT_POOL_SIZE = 10
+
+# Number of times a failed request is retried before giving up
+DEFAULT_MAX_RETRIES = 3
+
+# Retries wait backoff_factor * (2 ** (retry_number - 1)) seconds
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# HTTP status codes that will trigger a retry
+DEFAULT_RETRY_STATUSES = (502, 503, 504)
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 300)
+
+# Only idempotent requests are retried, a retried POST could create
+# duplicate records.
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+class SealogClient():
+    '''
+    Class that owns a pooled requests.Session used to submit requests to the
+    sealog-server API.  Connections are kept alive and reused between calls.
+    '''
+
+    def __init__(self, headers=None, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR, timeout=DEFAULT_TIMEOUT): # pylint: disable=too-many-arguments
+        self._headers = headers if headers is not None else HEADERS
+        self._timeout = timeout
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=DEFAULT_RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False
+        )
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self._session = requests.Session()
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def request(self, method, url, headers=None, **kwargs):
+        '''
+        Submit a request to the given url using the pooled session.  If
+        headers is not defined the client's default headers are used.
+        '''
+
+        kwargs.setdefault('timeout', self._timeout)
+
+        logging.debug("%s %s", method, url)
+        return self._session.request(method, url, headers=headers if headers is not None else self._headers, **kwargs)
+
+    def get(self, url, headers=None, **kwargs):
+        '''
+        Submit a GET request to the given url.
+        '''
+
+        return self.request('GET', url, headers=headers, **kwargs)
+
+    def post(self, url, headers=None, **kwargs):
+        '''
+        Submit a POST request to the given url.
+        '''
+
+        return self.request('POST', url, headers=headers, **kwargs)
+
+    def patch(self, url, headers=None, **kwargs):
+        '''
+        Submit a PATCH request to the given url.
+        '''
+
+        return self.request('PATCH', url, headers=headers, **kwargs)
+
+    def delete(self, url, headers=None, **kwargs):
+        '''
+        Submit a DELETE request to the given url.
+        '''
+
+        return self.request('DELETE', url, headers=headers, **kwargs)
+
+    def close(self):
+        '''
+        Close the pooled session and all of its connections.
+        '''
+
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def session(self):
+        '''
+        Getter method for the _session property
+        '''
+        return self._session
+
+    @property
+    def headers(self):
+        '''
+        Getter method for the _headers property
+        '''
+        return self._headers
+
+    @property
+    def timeout(self):
+        '''
+        Getter method for the _timeout property
+        '''
+        return self._timeout
+
+
+_DEFAULT_CLIENT = None
+_DEFAULT_CLIENT_LOCK = threading.Lock()
+
+def get_default_client():
+    '''
+    Return the shared SealogClient instance used by the wrapper functions,
+    creating it on first use.
+    '''
+
+    global _DEFAULT_CLIENT # pylint: disable=global-statement
+
+    if _DEFAULT_CLIENT is None:
+        with _DEFAULT_CLIENT_LOCK:
+            if _DEFAULT_CLIENT is None:
+                _DEFAULT_CLIENT = SealogClient()
+
+    return _DEFAULT_CLIENT
+
+
+def set_default_client(client):
+    '''
+    Replace the shared SealogClient instance used by the wrapper functions,
+    i.e. to change the pool size, retry policy or timeouts.  Returns the
+    previous instance.
+    '''
+
+    global _DEFAULT_CLIENT # pylint: disable=global-statement
+
+    with _DEFAULT_CLIENT_LOCK:
+        previous_client = _DEFAULT_CLIENT
+        _DEFAULT_CLIENT = client
+
+    return previous_client
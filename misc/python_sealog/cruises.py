@@ -19,8 +19,8 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
 from .settings import API_SERVER_URL, HEADERS, CRUISES_API_PATH
 
 def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
@@ -32,7 +32,7 @@ def get_cruise(cruise_uid, export_format='json', api_server_url=API_SERVER_URL,
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/' + cruise_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -58,7 +58,7 @@ def get_cruises(export_format='json', api_server_url=API_SERVER_URL, headers=HEA
 
     try:
         url = api_server_url + CRUISES_API_PATH + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -88,7 +88,7 @@ def get_cruise_uid_by_id(cruise_id, api_server_url=API_SERVER_URL, headers=HEADE
 
     try:
         url = api_server_url + CRUISES_API_PATH + '?cruise_id=' + cruise_id
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             cruise = json.loads(req.text)[0]
@@ -111,7 +111,7 @@ def get_cruise_by_id(cruise_id, export_format='json', api_server_url=API_SERVER_
 
     try:
         url = api_server_url + CRUISES_API_PATH + '?cruise_id=' + cruise_id + '&format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -138,7 +138,7 @@ def get_cruise_by_lowering(lowering_uid, export_format='json', api_server_url=AP
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/bylowering/' + lowering_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -165,7 +165,7 @@ def get_cruise_by_event(event_uid, export_format='json', api_server_url=API_SERV
 
     try:
         url = api_server_url + CRUISES_API_PATH + '/byevent/' + event_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -181,3 +181,44 @@ def get_cruise_by_event(event_uid, export_format='json', api_server_url=API_SERV
         raise error
 
     return None
+
+
+def create_cruise(cruise_record, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit a new cruise record.  Returns the server response as a json object
+    if the cruise was created, otherwise returns None.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH
+        req = get_default_client().post(url, headers=headers, data = json.dumps(cruise_record))
+        logging.debug(req.text)
+
+        if req.status_code == 201:
+            return json.loads(req.text)
+
+    except Exception as error:
+        logging.error('Error creating cruise record')
+        logging.debug(str(error))
+        raise error
+
+    return None
+
+
+def update_cruise(cruise_uid, payload, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Update the cruise record whose uid is cruise_uid with the contents of
+    payload.  Returns True if the update was successful.
+    '''
+
+    try:
+        url = api_server_url + CRUISES_API_PATH + '/' + cruise_uid
+        req = get_default_client().patch(url, headers=headers, data = json.dumps(payload))
+        logging.debug(req.text)
+
+        return req.status_code == 204
+
+    except Exception as error:
+        logging.error('Error updating cruise record')
+        logging.debug(str(error))
+        raise error
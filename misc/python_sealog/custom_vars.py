@@ -19,8 +19,8 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
 from .settings import API_SERVER_URL, HEADERS, CUSTOM_VAR_API_PATH
 
 def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
@@ -30,7 +30,7 @@ def get_custom_var(var_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
         logging.debug(req.text)
 
         if req.status_code != 404:
@@ -53,7 +53,7 @@ def get_custom_var_uid_by_name(var_name, api_server_url=API_SERVER_URL, headers=
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH + '?name=' + var_name
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
         logging.debug(req.text)
 
         if req.status_code != 404:
@@ -75,7 +75,7 @@ def get_custom_var_by_name(var_name, api_server_url=API_SERVER_URL, headers=HEAD
 
     try:
         url = api_server_url + CUSTOM_VAR_API_PATH + '?name=' + var_name
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
         logging.debug(req.text)
 
         if req.status_code != 404:
@@ -96,7 +96,7 @@ def set_custom_var(var_uid, value, api_server_url=API_SERVER_URL, headers=HEADER
 
     try:
         payload = { "custom_var_value": value}
-        req = requests.patch(API_SERVER_URL + CUSTOM_VAR_API_PATH + '/' + var_uid, headers=HEADERS, data = json.dumps(payload))
+        req = get_default_client().patch(api_server_url + CUSTOM_VAR_API_PATH + '/' + var_uid, headers=headers, data = json.dumps(payload))
         logging.debug(req.text)
 
     except Exception as error:
@@ -19,23 +19,33 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
+from concurrent.futures import ThreadPoolExecutor
 
+from .client import DEFAULT_POOL_SIZE, get_default_client
+from .json_stream import iter_json_response
 from .settings import API_SERVER_URL, HEADERS, EVENT_AUX_DATA_API_PATH
 
-def get_event_aux_data_by_cruise(cruise_uid, datasource=None, api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_event_aux_data_by_cruise(cruise_uid, datasource=None, api_server_url=API_SERVER_URL, headers=HEADERS, stream=False):
     '''
     Return the aux_data records for the given cruise_uid and optional
-    datasource.
+    datasource.  Set stream to True to return a generator that decodes the
+    records one at a time as they are read from the server.
     '''
 
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid
 
         if datasource is not None:
-            url += '&datasource=' + datasource
+            url += '?datasource=' + datasource
 
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers, stream=stream)
+
+        if stream:
+            if req.status_code != 404:
+                return iter_json_response(req)
+
+            req.close()
+            return iter([])
 
         if req.status_code != 404:
             event_aux_data = json.loads(req.text)
@@ -49,10 +59,11 @@ def get_event_aux_data_by_cruise(cruise_uid, datasource=None, api_server_url=API
     return None
 
 
-def get_event_aux_data_by_lowering(lowering_uid, datasource='', limit=0, api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_event_aux_data_by_lowering(lowering_uid, datasource='', limit=0, api_server_url=API_SERVER_URL, headers=HEADERS, stream=False): # pylint: disable=too-many-arguments
     '''
     Return the aux_data records for the given lowering_uid and optional
-    datasource.
+    datasource.  Set stream to True to return a generator that decodes the
+    records one at a time as they are read from the server.
     '''
 
     try:
@@ -72,7 +83,14 @@ def get_event_aux_data_by_lowering(lowering_uid, datasource='', limit=0, api_ser
 
         logging.info(url)
 
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers, stream=stream)
+
+        if stream:
+            if req.status_code != 404:
+                return iter_json_response(req)
+
+            req.close()
+            return iter([])
 
         event_aux_data = json.loads(req.text)
         logging.debug(json.dumps(event_aux_data))
@@ -81,3 +99,47 @@ def get_event_aux_data_by_lowering(lowering_uid, datasource='', limit=0, api_ser
     except Exception as error:
         logging.debug(str(error))
         raise error
+
+
+def create_event_aux_data(aux_data_record, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit an aux_data record.  If an aux_data record already exists for the
+    same event_id and data_source it will be updated.  Returns True if the
+    record was inserted or updated, otherwise returns False.
+    '''
+
+    try:
+        url = api_server_url + EVENT_AUX_DATA_API_PATH
+        req = get_default_client().post(url, headers=headers, data = json.dumps(aux_data_record))
+        logging.debug("Response: %s", req.text)
+
+        return req.status_code in (201, 204)
+
+    except Exception as error:
+        logging.error('Error submitting aux_data record')
+        logging.debug(str(error))
+        raise error
+
+
+def create_event_aux_data_bulk(aux_data_records, workers=DEFAULT_POOL_SIZE, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit a list of aux_data records using a pool of workers sharing the
+    default client's connection pool.  Returns the number of records that
+    were inserted or updated.
+    '''
+
+    def submit(aux_data_record):
+        try:
+            return create_event_aux_data(aux_data_record, api_server_url=api_server_url, headers=headers)
+        except Exception:
+            logging.warning("Could not submit aux_data record for event: %s", aux_data_record['event_id'])
+            return False
+
+    if not aux_data_records:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(aux_data_records)))) as executor:
+        submitted = sum(executor.map(submit, aux_data_records))
+
+    logging.debug("Submitted %d of %d aux_data records", submitted, len(aux_data_records))
+    return submitted
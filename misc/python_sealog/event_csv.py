@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_csv.py
+
+DESCRIPTION:    This script contains the functions used to convert the json
+                records returned by the sealog-server event and event_export
+                routes to csv locally, using the same column layout as the
+                server's format=csv output.
+
+BUGS:
+NOTES:      events_to_csv mirrors _flattenJSON/_buildCSVHeaders in
+            routes/api/v1/events.js.  event_exports_to_csv mirrors
+            flattenEventJSON/convertToCSV in routes/api/v1/json_util.js.
+            Keep them in sync with the server.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import math
+
+EVENT_CSV_HEADERS = ['id', 'ts', 'event_value', 'event_author', 'event_free_text']
+
+PREFIX_ORDERING_REALTIME = [
+    "ts",
+    "vehicleRealtimeNavData.latitude (ddeg)",
+    "vehicleRealtimeNavData.longitude (ddeg)",
+    "event",
+    "vehicleRealtime",
+    "vehicleReNav",
+    "id"
+]
+
+PREFIX_ORDERING_RENAV = [
+    "ts",
+    "vehicleReNavData.latitude (ddeg)",
+    "vehicleReNavData.longitude (ddeg)",
+    "event",
+    "vehicleReNav",
+    "vehicleRealtime",
+    "id"
+]
+
+NAV_COLUMNS = ['latitude', 'longitude', 'heading', 'depth', 'altitude']
+
+def _json_stringify(value):
+    '''
+    Return the value formatted the way javascript's JSON.stringify would.
+    '''
+
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _js_or_empty(value):
+    '''
+    Return the value, or '' if javascript would consider the value falsy.
+    '''
+
+    if value is None or value is False or value == '':
+        return ''
+
+    # 0 and NaN are also falsy
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and (value == 0 or math.isnan(value)):
+        return ''
+
+    return value
+
+
+def _json2csv_value(value):
+    '''
+    Return the value formatted the way the json2csv parser formats a field.
+    '''
+
+    if value is None:
+        return ''
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    if isinstance(value, (int, float)):
+        return _json_stringify(value)
+
+    if not isinstance(value, str):
+        value = _json_stringify(value)
+        if value.startswith('"') and value.endswith('"') and len(value) > 1:
+            value = value[1:-1]
+
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _flatten_event(event):
+    '''
+    Return a flattened copy of the event record as built by the server's
+    events csv export.
+    '''
+
+    flat_event = dict(event)
+
+    for event_option in flat_event.get('event_options', []):
+        flat_event['event_option.' + event_option['event_option_name']] = event_option['event_option_value']
+
+    flat_event.pop('event_options', None)
+
+    flat_event['event_free_text'] = '"' + flat_event.get('event_free_text', '').replace('"', '\\"') + '"'
+
+    return flat_event
+
+
+def events_to_csv(events):
+    '''
+    Convert the event records returned by the /events/bycruise and
+    /events/bylowering routes to the csv returned by the same routes when
+    format=csv.
+    '''
+
+    if not events:
+        return ''
+
+    flat_events = [_flatten_event(event) for event in events]
+
+    headers = list(EVENT_CSV_HEADERS)
+    header_set = set(headers)
+
+    for flat_event in flat_events:
+        for key in flat_event:
+            if key not in header_set:
+                header_set.add(key)
+                headers.append(key)
+
+    headers = headers[:len(EVENT_CSV_HEADERS)] + sorted(headers[len(EVENT_CSV_HEADERS):])
+
+    lines = [','.join(_json2csv_value(header) for header in headers)]
+    lines.extend(','.join(_json2csv_value(flat_event.get(header)) for header in headers) for flat_event in flat_events)
+
+    return '\n'.join(lines)
+
+
+def _flatten_event_export(event):
+    '''
+    Return a flattened copy of the event_export record, with the event_options
+    and aux_data flattened into columns, as built by the server's
+    event_exports csv export.
+    '''
+
+    flat_event = dict(event)
+
+    for event_option in flat_event.get('event_options', []):
+        flat_event['event_option.' + event_option['event_option_name']] = event_option['event_option_value']
+
+    flat_event.pop('event_options', None)
+
+    for aux_row in flat_event.pop('aux_data', None) or []:
+        name_counts = {}
+        for aux_col in aux_row['data_array']:
+            name_counts[aux_col['data_name']] = name_counts.get(aux_col['data_name'], 0) + 1
+
+        name_positions = {}
+        for aux_col in aux_row['data_array']:
+            label = aux_row['data_source'] + '.' + aux_col['data_name']
+
+            # Add position to column label if there are multiple columns with
+            # the same name
+            if name_counts[aux_col['data_name']] > 1:
+                name_positions[aux_col['data_name']] = name_positions.get(aux_col['data_name'], 0) + 1
+                label += '_' + str(name_positions[aux_col['data_name']])
+
+            if aux_col.get('data_uom'):
+                label += ' (' + aux_col['data_uom'] + ')'
+
+            flat_event[label] = aux_col['data_value']
+
+    return flat_event
+
+
+def event_exports_to_csv(events, use_renav=False):
+    '''
+    Convert the event_export records returned by the /event_exports/bycruise
+    and /event_exports/bylowering routes to the csv returned by the same
+    routes when format=csv.  Set use_renav to True to match use_renav=true.
+    '''
+
+    if not events:
+        return ''
+
+    flat_events = [_flatten_event_export(event) for event in events]
+
+    unordered = []
+    unordered_set = set()
+    for flat_event in flat_events:
+        for key in flat_event:
+            if key not in unordered_set:
+                unordered_set.add(key)
+                unordered.append(key)
+
+    # Sort headers according to how they are ordered in the prefix list, any
+    # headers that don't start with one of the prefixes are added to the end
+    headers = []
+    for prefix in PREFIX_ORDERING_RENAV if use_renav else PREFIX_ORDERING_REALTIME:
+        headers.extend(header for header in unordered if header.startswith(prefix))
+        unordered = [header for header in unordered if not header.startswith(prefix)]
+
+    headers.extend(unordered)
+
+    # Ensure 'id' column is at the end
+    if 'id' in headers:
+        headers.remove('id')
+        headers.append('id')
+
+    # Only use realtime or renav for long, lat, alt, depth and heading
+    exclude_prefix = 'vehicleRealtimeNavData.' if use_renav else 'vehicleReNavData.'
+    for prefix in [exclude_prefix + column for column in NAV_COLUMNS]:
+        header = next((header for header in headers if header.startswith(prefix)), None)
+        if header is not None:
+            headers.remove(header)
+
+    lines = [','.join('Date/Time (UTC)' if header == 'ts' else header for header in headers)]
+    lines.extend(','.join(_json_stringify(_js_or_empty(flat_event.get(header))) for header in headers) for flat_event in flat_events)
+
+    return '\n'.join(lines)
@@ -19,35 +19,68 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
+from .json_stream import iter_json_response
+from .paging import DEFAULT_PAGE_SIZE, iter_pages
+from .time_windows import build_time_query, clamp_time_window, fetch_time_windows
+from .cruises import get_cruise
+from .lowerings import get_lowering
 from .settings import API_SERVER_URL, HEADERS, EVENT_EXPORTS_API_PATH
 
 
-def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS, stream=False, start_ts=None, stop_ts=None, windows=1): # pylint: disable=too-many-arguments, too-many-locals
     '''
     Return the event_exports for the cruise with the given cruise_uid.  Returns
     the records as an array of json objects by default.  Set export_format to
     'csv' to return the records in csv format.  Optionally set a event_filter
     that will limit the returns to on the events that match the event_filter.
+    Set stream to True to return a generator that decodes the json records one
+    at a time as they are read from the server.  Optionally define
+    start_ts/stop_ts to limit the events to that time window.  Set windows to
+    split the time window into that many sub-windows that are requested in
+    parallel and merged back in ts order (json only).
     '''
 
+    stream = stream and export_format == 'json'
+
+    if windows > 1 and export_format == 'json' and not stream:
+        cruise = get_cruise(cruise_uid, api_server_url=api_server_url, headers=headers)
+        if cruise is None:
+            return None
+
+        time_window = clamp_time_window(start_ts, stop_ts, cruise['start_ts'], cruise['stop_ts'])
+        if time_window is None:
+            return []
+
+        return fetch_time_windows(lambda window_start_ts, window_stop_ts: get_event_exports_by_cruise(cruise_uid, event_filter=event_filter, start_ts=window_start_ts, stop_ts=window_stop_ts, api_server_url=api_server_url, headers=headers), *time_window, windows)
+
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH + '/bycruise/' + cruise_uid + '?format=' + export_format
 
         if event_filter != '':
             url += '&value=' + event_filter
 
-        req = requests.get(url, headers=headers)
+        for query in build_time_query(start_ts, stop_ts):
+            url += '&' + query
+
+        req = get_default_client().get(url, headers=headers, stream=stream)
 
         if req.status_code != 404:
 
+            if stream:
+                return iter_json_response(req)
+
             if export_format == 'json':
                 events = json.loads(req.text)
                 return events
 
             return req.text
 
+        if stream:
+            req.close()
+            return iter([])
+
     except Exception as error:
         logging.debug(str(error))
         raise error
@@ -55,33 +88,92 @@ def get_event_exports_by_cruise(cruise_uid, export_format='json', event_filter='
     return None
 
 
-def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_event_exports_by_lowering(lowering_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS, stream=False, start_ts=None, stop_ts=None, windows=1): # pylint: disable=too-many-arguments, too-many-locals
     '''
     Return the event_exports for the lowering with the given lowering_uid.
     Returns the records as an array of json objects by default.  Set
     export_format to 'csv' to return the records in csv format.  Optionally set
     a event_filter that will limit the returns to on the events that match the
-    event_filter.
+    event_filter.  Set stream to True to return a generator that decodes the
+    json records one at a time as they are read from the server.  Optionally
+    define start_ts/stop_ts to limit the events to that time window.  Set
+    windows to split the time window into that many sub-windows that are
+    requested in parallel and merged back in ts order (json only).
     '''
 
+    stream = stream and export_format == 'json'
+
+    if windows > 1 and export_format == 'json' and not stream:
+        lowering = get_lowering(lowering_uid, api_server_url=api_server_url, headers=headers)
+        if lowering is None:
+            return None
+
+        time_window = clamp_time_window(start_ts, stop_ts, lowering['start_ts'], lowering['stop_ts'])
+        if time_window is None:
+            return []
+
+        return fetch_time_windows(lambda window_start_ts, window_stop_ts: get_event_exports_by_lowering(lowering_uid, event_filter=event_filter, start_ts=window_start_ts, stop_ts=window_stop_ts, api_server_url=api_server_url, headers=headers), *time_window, windows)
+
     try:
         url = api_server_url + EVENT_EXPORTS_API_PATH + '/bylowering/' + lowering_uid + '?format=' + export_format
 
         if event_filter != '':
             url += '&value=' + event_filter
 
-        req = requests.get(url, headers=headers)
+        for query in build_time_query(start_ts, stop_ts):
+            url += '&' + query
+
+        req = get_default_client().get(url, headers=headers, stream=stream)
 
         if req.status_code != 404:
 
+            if stream:
+                return iter_json_response(req)
+
             if export_format == 'json':
                 events = json.loads(req.text)
                 return events
 
             return req.text
 
+        if stream:
+            req.close()
+            return iter([])
+
     except Exception as error:
         logging.debug(str(error))
         raise error
 
     return None
+
+
+def iter_event_exports_by_cruise(cruise_uid, event_filter='', page_size=DEFAULT_PAGE_SIZE, prefetch=True, api_server_url=API_SERVER_URL, headers=HEADERS): # pylint: disable=too-many-arguments
+    '''
+    Yield the event_exports for the cruise with the given cruise_uid one at a
+    time.  The records are requested from the server page_size records at a
+    time and the next page is prefetched in the background unless prefetch is
+    False.  Optionally set a event_filter that will limit the returns to on
+    the events that match the event_filter.
+    '''
+
+    url = api_server_url + EVENT_EXPORTS_API_PATH + '/bycruise/' + cruise_uid
+    if event_filter != '':
+        url += '?value=' + event_filter
+
+    return iter_pages(url, page_size=page_size, prefetch=prefetch, headers=headers)
+
+
+def iter_event_exports_by_lowering(lowering_uid, event_filter='', page_size=DEFAULT_PAGE_SIZE, prefetch=True, api_server_url=API_SERVER_URL, headers=HEADERS): # pylint: disable=too-many-arguments
+    '''
+    Yield the event_exports for the lowering with the given lowering_uid one
+    at a time.  The records are requested from the server page_size records at
+    a time and the next page is prefetched in the background unless prefetch
+    is False.  Optionally set a event_filter that will limit the returns to on
+    the events that match the event_filter.
+    '''
+
+    url = api_server_url + EVENT_EXPORTS_API_PATH + '/bylowering/' + lowering_uid
+    if event_filter != '':
+        url += '?value=' + event_filter
+
+    return iter_pages(url, page_size=page_size, prefetch=prefetch, headers=headers)
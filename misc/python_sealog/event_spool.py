@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+'''
+FILE:           event_spool.py
+
+DESCRIPTION:    This script contains the EventSpool class used by the repeater
+                services to store events in a local append-only log until
+                they have been acknowledged by the destination server.
+
+BUGS:
+NOTES:      The spool is a sqlite database in WAL mode.  Every appended event
+            gets an increasing sequence number and the sequence number of the
+            last acknowledged event is stored with the events, so a restarted
+            repeater resumes with the first unacknowledged event.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import time
+import logging
+import sqlite3
+
+SPOOL_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id TEXT UNIQUE,
+    event TEXT NOT NULL,
+    spooled REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+class EventSpool():
+    '''
+    Class that stores events in a sqlite append-only log.  Events with the
+    id of an event already in the spool are ignored.  Acknowledged events
+    are kept until purge() is called.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SPOOL_SCHEMA)
+
+        row = self._conn.execute("SELECT value FROM state WHERE name = 'last_acked'").fetchone()
+        self._last_acked = row[0] if row else 0
+
+        logging.debug("Opened event spool %s, %d event(s) not acknowledged", path, self.backlog)
+
+    def append(self, event):
+        '''
+        Add the event to the spool.  Returns the event's sequence number or
+        None if an event with the same id is already in the spool.
+        '''
+
+        with self._conn:
+            cursor = self._conn.execute('INSERT OR IGNORE INTO events (event_id, event, spooled) VALUES (?, ?, ?)', (event.get('id'), json.dumps(event), time.time()))
+
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def pending(self, limit=None):
+        '''
+        Return the list of (seq, event) not acknowledged yet, oldest first, at
+        most limit.
+        '''
+
+        rows = self._conn.execute('SELECT seq, event FROM events WHERE seq > ? ORDER BY seq LIMIT ?', (self._last_acked, -1 if limit is None else limit))
+
+        return [ (seq, json.loads(event)) for seq, event in rows ]
+
+    def ack(self, seq):
+        '''
+        Acknowledge the events up to and including sequence number seq.
+        '''
+
+        if seq <= self._last_acked:
+            return
+
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO state (name, value) VALUES ('last_acked', ?)", (seq,))
+
+        self._last_acked = seq
+
+    def purge(self):
+        '''
+        Delete the acknowledged events.  Returns the number of events deleted.
+        '''
+
+        with self._conn:
+            cursor = self._conn.execute('DELETE FROM events WHERE seq <= ?', (self._last_acked,))
+
+        return cursor.rowcount
+
+    def close(self):
+        '''
+        Close the spool database.
+        '''
+
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def last_acked(self):
+        '''
+        Getter method for the _last_acked property
+        '''
+        return self._last_acked
+
+    @property
+    def backlog(self):
+        '''
+        Number of events not acknowledged yet
+        '''
+        return self._conn.execute('SELECT COUNT(*) FROM events WHERE seq > ?', (self._last_acked,)).fetchone()[0]
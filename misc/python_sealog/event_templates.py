@@ -19,8 +19,8 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
 from .settings import API_SERVER_URL, HEADERS, EVENT_TEMPLATES_API_PATH
 
 def get_event_templates(system=True, non_system=True, api_server_url=API_SERVER_URL, headers=HEADERS):
@@ -34,7 +34,7 @@ def get_event_templates(system=True, non_system=True, api_server_url=API_SERVER_
 
     try:
         url = api_server_url + EVENT_TEMPLATES_API_PATH
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code != 404:
             event_templates = json.loads(req.text)
@@ -19,8 +19,13 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
+from .json_stream import iter_json_response
+from .paging import DEFAULT_PAGE_SIZE, get_page, iter_pages
+from .time_windows import build_time_query, clamp_time_window, fetch_time_windows
+from .cruises import get_cruise
+from .lowerings import get_lowering
 from .settings import API_SERVER_URL, HEADERS, EVENTS_API_PATH
 
 def get_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, headers=HEADERS):
@@ -32,7 +37,7 @@ def get_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, he
 
     try:
         url = api_server_url + EVENTS_API_PATH + '/' + event_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -50,31 +55,57 @@ def get_event(event_uid, export_format='json', api_server_url=API_SERVER_URL, he
     return None
 
 
-def get_events_by_cruise(cruise_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_events_by_cruise(cruise_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS, stream=False, start_ts=None, stop_ts=None, windows=1): # pylint: disable=too-many-arguments
     '''
     Return event records based on the cruise_uid.  Returns the records as json
     objects by default.  Set export_format to 'csv' to return the records in
     csv format.  Optionally define an event_filter to filter the returned
-    events.
+    events.  Set stream to True to return a generator that decodes the json
+    records one at a time as they are read from the server.  Optionally define
+    start_ts/stop_ts to limit the events to that time window.  Set windows to
+    split the time window into that many sub-windows that are requested in
+    parallel and merged back in ts order (json only).
     '''
 
+    stream = stream and export_format == 'json'
+
+    if windows > 1 and export_format == 'json' and not stream:
+        cruise = get_cruise(cruise_uid, api_server_url=api_server_url, headers=headers)
+        if cruise is None:
+            return None
+
+        time_window = clamp_time_window(start_ts, stop_ts, cruise['start_ts'], cruise['stop_ts'])
+        if time_window is None:
+            return []
+
+        return fetch_time_windows(lambda window_start_ts, window_stop_ts: get_events_by_cruise(cruise_uid, event_filter=event_filter, start_ts=window_start_ts, stop_ts=window_stop_ts, api_server_url=api_server_url, headers=headers), *time_window, windows)
+
     try:
         url = api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid + '?format=' + export_format
         if event_filter != '':
             url += '&value=' + event_filter
 
-        req = requests.get(url, headers=headers)
+        for query in build_time_query(start_ts, stop_ts):
+            url += '&' + query
+
+        req = get_default_client().get(url, headers=headers, stream=stream)
 
         if req.status_code == 200:
+            if stream:
+                return iter_json_response(req)
+
             if export_format == 'json':
                 return json.loads(req.text)
 
             if export_format == 'csv':
                 return req.text
 
+        if stream:
+            req.close()
+
         if req.status_code == 404:
             if export_format == 'json':
-                return []
+                return iter([]) if stream else []
 
             if export_format == 'csv':
                 return ""
@@ -86,22 +117,44 @@ def get_events_by_cruise(cruise_uid, export_format='json', event_filter='', api_
     return None
 
 
-def get_events_by_lowering(lowering_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+def get_events_by_lowering(lowering_uid, export_format='json', event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS, stream=False, start_ts=None, stop_ts=None, windows=1): # pylint: disable=too-many-arguments
     '''
     Return event records based on the lowering_uid.  Returns the records as
     json objects by default.  Set export_format to 'csv' to return the records
     in csv format.  Optionally define an event_filter to filter the returned
-    events.
+    events.  Set stream to True to return a generator that decodes the json
+    records one at a time as they are read from the server.  Optionally define
+    start_ts/stop_ts to limit the events to that time window.  Set windows to
+    split the time window into that many sub-windows that are requested in
+    parallel and merged back in ts order (json only).
     '''
 
+    stream = stream and export_format == 'json'
+
+    if windows > 1 and export_format == 'json' and not stream:
+        lowering = get_lowering(lowering_uid, api_server_url=api_server_url, headers=headers)
+        if lowering is None:
+            return None
+
+        time_window = clamp_time_window(start_ts, stop_ts, lowering['start_ts'], lowering['stop_ts'])
+        if time_window is None:
+            return []
+
+        return fetch_time_windows(lambda window_start_ts, window_stop_ts: get_events_by_lowering(lowering_uid, event_filter=event_filter, start_ts=window_start_ts, stop_ts=window_stop_ts, api_server_url=api_server_url, headers=headers), *time_window, windows)
+
     try:
         url = api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid + '?format=' + export_format
         if event_filter != '':
             url += '&value=' + event_filter
 
-        req = requests.get(url, headers=headers)
+        for query in build_time_query(start_ts, stop_ts):
+            url += '&' + query
+
+        req = get_default_client().get(url, headers=headers, stream=stream)
 
         if req.status_code == 200:
+            if stream:
+                return iter_json_response(req)
 
             if export_format == 'json':
                 return json.loads(req.text)
@@ -109,9 +162,12 @@ def get_events_by_lowering(lowering_uid, export_format='json', event_filter='',
             if export_format == 'csv':
                 return req.text
 
+        if stream:
+            req.close()
+
         if req.status_code == 404:
             if export_format == 'json':
-                return []
+                return iter([]) if stream else []
 
             if export_format == 'csv':
                 return ""
@@ -121,3 +177,147 @@ def get_events_by_lowering(lowering_uid, export_format='json', event_filter='',
         raise error
 
     return None
+
+
+def iter_events_by_cruise(cruise_uid, event_filter='', page_size=DEFAULT_PAGE_SIZE, prefetch=True, api_server_url=API_SERVER_URL, headers=HEADERS): # pylint: disable=too-many-arguments
+    '''
+    Yield the event records for the given cruise_uid one at a time.  The
+    records are requested from the server page_size records at a time and the
+    next page is prefetched in the background unless prefetch is False.
+    Optionally define an event_filter to filter the returned events.
+    '''
+
+    url = api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid
+    if event_filter != '':
+        url += '?value=' + event_filter
+
+    return iter_pages(url, page_size=page_size, prefetch=prefetch, headers=headers)
+
+
+def iter_events_by_lowering(lowering_uid, event_filter='', page_size=DEFAULT_PAGE_SIZE, prefetch=True, api_server_url=API_SERVER_URL, headers=HEADERS): # pylint: disable=too-many-arguments
+    '''
+    Yield the event records for the given lowering_uid one at a time.  The
+    records are requested from the server page_size records at a time and the
+    next page is prefetched in the background unless prefetch is False.
+    Optionally define an event_filter to filter the returned events.
+    '''
+
+    url = api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid
+    if event_filter != '':
+        url += '?value=' + event_filter
+
+    return iter_pages(url, page_size=page_size, prefetch=prefetch, headers=headers)
+
+
+def get_event_count_by_cruise(cruise_uid, event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the number of event records for the given cruise_uid.  Optionally
+    define an event_filter to filter the counted events.
+    '''
+
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid + '/count'
+        if event_filter != '':
+            url += '?value=' + event_filter
+
+        req = get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            return json.loads(req.text)['events']
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+def get_event_count_by_lowering(lowering_uid, event_filter='', api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the number of event records for the given lowering_uid.  Optionally
+    define an event_filter to filter the counted events.
+    '''
+
+    try:
+        url = api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid + '/count'
+        if event_filter != '':
+            url += '?value=' + event_filter
+
+        req = get_default_client().get(url, headers=headers)
+
+        if req.status_code == 200:
+            return json.loads(req.text)['events']
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return None
+
+
+def get_last_event_by_cruise(cruise_uid, event_count=None, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the most recent event record for the given cruise_uid or None if
+    the cruise has no events.  Optionally define the event_count if it is
+    already known to save a request.
+    '''
+
+    if event_count is None:
+        event_count = get_event_count_by_cruise(cruise_uid, api_server_url=api_server_url, headers=headers)
+
+    if not event_count:
+        return None
+
+    try:
+        page = get_page(api_server_url + EVENTS_API_PATH + '/bycruise/' + cruise_uid, event_count - 1, 1, headers=headers)
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return next(iter(page), None)
+
+
+def get_last_event_by_lowering(lowering_uid, event_count=None, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Return the most recent event record for the given lowering_uid or None if
+    the lowering has no events.  Optionally define the event_count if it is
+    already known to save a request.
+    '''
+
+    if event_count is None:
+        event_count = get_event_count_by_lowering(lowering_uid, api_server_url=api_server_url, headers=headers)
+
+    if not event_count:
+        return None
+
+    try:
+        page = get_page(api_server_url + EVENTS_API_PATH + '/bylowering/' + lowering_uid, event_count - 1, 1, headers=headers)
+
+    except Exception as error:
+        logging.error(str(error))
+        raise error
+
+    return next(iter(page), None)
+
+
+def create_event(event, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Submit a new event record.  Returns the server response as a json object
+    if the event was created, otherwise returns None.
+    '''
+
+    try:
+        url = api_server_url + EVENTS_API_PATH
+        req = get_default_client().post(url, headers=headers, data = json.dumps(event))
+        logging.debug(req.text)
+
+        if req.status_code == 201:
+            return json.loads(req.text)
+
+    except Exception as error:
+        logging.error('Error creating event')
+        logging.debug(str(error))
+        raise error
+
+    return None
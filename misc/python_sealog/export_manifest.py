@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+'''
+FILE:           export_manifest.py
+
+DESCRIPTION:    This script contains the ExportManifest class used by the data
+                export scripts to record what has been written to an export
+                directory so that unchanged outputs are not re-fetched or
+                rewritten and a partially-completed export can be resumed.
+
+BUGS:
+NOTES:      The manifest is saved after every output so an export that is
+            interrupted only redoes the outputs that were not finished.
+            Whether the underlying data has changed is decided by comparing
+            source signatures (i.e. the record counts and the hash_records of
+            the events and aux data), so edited events and aux data added
+            after an event was created are picked up by the next export.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+MANIFEST_FILENAME = '.sealog_export_manifest.json'
+MANIFEST_VERSION = 1
+
+def hash_content(content):
+    '''
+    Return the sha256 hex digest of the given str or bytes content.
+    '''
+
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_records(records):
+    '''
+    Return the sha256 hex digest of the given json-serializable records.  The
+    keys are sorted so the same records always return the same digest.
+    '''
+
+    return hash_content(json.dumps(records, sort_keys=True, default=str))
+
+
+def build_signature(source):
+    '''
+    Return the signature for the given json-serializable source description.
+    Two sources with the same values return the same signature.
+    '''
+
+    return hash_content(json.dumps(source, sort_keys=True, default=str))
+
+
+def _atomic_write(path, content):
+    '''
+    Write the content to path via a temporary file so a crash never leaves a
+    partially written file in place.
+    '''
+
+    tmp_path = path + '.tmp'
+
+    with open(tmp_path, 'wb') as file:
+        file.write(content)
+
+    os.replace(tmp_path, path)
+
+
+class ExportManifest():
+    '''
+    Class that tracks the outputs written to a single export directory.  Each
+    output is recorded with its content hash, size, record count, latest
+    record ts and the signature of the source data it was built from.  If
+    force is True every output is treated as out-of-date but the manifest is
+    still maintained so that later incremental exports have a baseline.
+    '''
+
+    def __init__(self, export_dir, force=False, filename=MANIFEST_FILENAME):
+        self._export_dir = export_dir
+        self._force = force
+        self._path = os.path.join(export_dir, filename)
+        self._manifest = self._load()
+
+    def _load(self):
+
+        try:
+            with open(self._path, 'r') as file:
+                manifest = json.load(file)
+
+        except FileNotFoundError:
+            return {'version': MANIFEST_VERSION, 'sources': {}, 'outputs': {}}
+
+        except Exception as err:
+            logging.warning("Could not read export manifest, starting a new one: %s", self._path)
+            logging.debug(str(err))
+            return {'version': MANIFEST_VERSION, 'sources': {}, 'outputs': {}}
+
+        if manifest.get('version') != MANIFEST_VERSION:
+            logging.warning("Unsupported export manifest version, starting a new one: %s", self._path)
+            return {'version': MANIFEST_VERSION, 'sources': {}, 'outputs': {}}
+
+        return manifest
+
+    def save(self):
+        '''
+        Save the manifest to the export directory.
+        '''
+
+        _atomic_write(self._path, json.dumps(self._manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    def update_source(self, name, source):
+        '''
+        Record the description of the named source data (i.e. the event count
+        and latest event ts) and return its signature.  Returns None if
+        source is None, meaning the source could not be described and any
+        output built from it should always be rebuilt.
+        '''
+
+        if source is None:
+            return None
+
+        self._manifest['sources'][name] = source
+
+        return build_signature(source)
+
+    def is_current(self, names, signature):
+        '''
+        Return True if all the named outputs were completed from source data
+        with the given signature and are still present in the export
+        directory.
+        '''
+
+        if self._force or signature is None:
+            return False
+
+        for name in names:
+            entry = self._manifest['outputs'].get(name)
+
+            if entry is None or entry.get('signature') != signature:
+                return False
+
+            path = os.path.join(self._export_dir, name)
+
+            if not os.path.exists(path):
+                return False
+
+            if 'size' in entry and os.path.getsize(path) != entry['size']:
+                return False
+
+        return True
+
+    def write_file(self, name, content, signature=None, records=None, latest_ts=None): # pylint: disable=too-many-arguments
+        '''
+        Write the content to the named output file and record it in the
+        manifest.  The file is not rewritten if it already exists with the
+        same content.  If signature is None the output is never considered
+        current by is_current.  Returns True if the file was written.
+        '''
+
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        sha256 = hash_content(data)
+        path = os.path.join(self._export_dir, name)
+
+        entry = self._manifest['outputs'].get(name, {})
+
+        written = self._force or entry.get('sha256') != sha256 or not os.path.exists(path) or os.path.getsize(path) != len(data)
+
+        if written:
+            _atomic_write(path, data)
+        else:
+            logging.debug("Output unchanged, not rewriting: %s", name)
+
+        self._manifest['outputs'][name] = {
+            'sha256': sha256,
+            'size': len(data),
+            'signature': signature,
+            'records': records,
+            'latest_ts': latest_ts,
+            'updated': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ') if written else entry.get('updated')
+        }
+
+        self.save()
+
+        return written
+
+    def mark_current(self, name, signature):
+        '''
+        Record that the named output that is not a single file (i.e. a
+        directory of images) was completed from source data with the given
+        signature.
+        '''
+
+        self._manifest['outputs'][name] = {
+            'signature': signature,
+            'updated': datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        }
+
+        self.save()
+
+    @property
+    def force(self):
+        '''
+        Getter method for the _force property
+        '''
+        return self._force
+
+    @property
+    def path(self):
+        '''
+        Getter method for the _path property
+        '''
+        return self._path
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+'''
+FILE:           file_copier.py
+
+DESCRIPTION:    This script contains the FileCopier class used by the data
+                export scripts to copy large numbers of files (i.e.
+                framegrabs) into an export directory using a pool of threads.
+
+BUGS:
+NOTES:      Files are copied with os.copy_file_range or os.sendfile where the
+            platform supports them so the data never passes through python.
+            Unchanged files are skipped by comparing size and mtime, the same
+            quick check rsync uses by default.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import os
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Default number of files copied at the same time
+DEFAULT_COPY_WORKERS = 8
+
+# Number of bytes requested per zero-copy call
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# How often, in files, progress is logged
+PROGRESS_LOG_INTERVAL = 500
+
+class CopyProgress():
+    '''
+    Class that holds the thread-safe progress counters of a FileCopier run.
+    '''
+
+    def __init__(self, total=0):
+        self._lock = threading.Lock()
+        self.total = total
+        self.copied = 0
+        self.linked = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.failed = 0
+        self.bytes_copied = 0
+
+    def increment(self, counter, nbytes=0):
+        '''
+        Increment the named counter and the number of bytes copied.
+        '''
+
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.bytes_copied += nbytes
+
+    @property
+    def completed(self):
+        '''
+        Number of files that have been processed, successfully or not.
+        '''
+        return self.copied + self.linked + self.skipped + self.failed
+
+    def as_dict(self):
+        '''
+        Return a snapshot of the counters as a dict.
+        '''
+
+        with self._lock:
+            return {
+                'total': self.total,
+                'copied': self.copied,
+                'linked': self.linked,
+                'skipped': self.skipped,
+                'deleted': self.deleted,
+                'failed': self.failed,
+                'bytes_copied': self.bytes_copied
+            }
+
+    def __str__(self):
+        return '{completed}/{total} files ({copied} copied, {linked} linked, {skipped} unchanged, {failed} failed, {deleted} deleted), {bytes_copied} bytes'.format(completed=self.completed, **self.as_dict())
+
+
+def _copy_fd(src_fd, dest_fd, size):
+    '''
+    Copy size bytes from src_fd to dest_fd, using the fastest method the
+    platform supports.
+    '''
+
+    copied = 0
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                sent = os.copy_file_range(src_fd, dest_fd, min(COPY_CHUNK_SIZE, size - copied))
+                if sent == 0:
+                    break
+                copied += sent
+
+            return copied
+
+        except OSError:
+            # i.e. not supported across these filesystems, fall through
+            pass
+
+    if hasattr(os, 'sendfile'):
+        try:
+            while copied < size:
+                sent = os.sendfile(dest_fd, src_fd, copied, min(COPY_CHUNK_SIZE, size - copied))
+                if sent == 0:
+                    break
+                copied += sent
+
+            return copied
+
+        except OSError:
+            pass
+
+    os.lseek(src_fd, copied, os.SEEK_SET)
+    os.lseek(dest_fd, copied, os.SEEK_SET)
+
+    with os.fdopen(os.dup(src_fd), 'rb') as src_file, os.fdopen(os.dup(dest_fd), 'wb') as dest_file:
+        shutil.copyfileobj(src_file, dest_file)
+
+    return size
+
+
+def _is_unchanged(src_stat, dest_path):
+    '''
+    Return True if the file at dest_path has the same size and mtime as the
+    source file.
+    '''
+
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    return dest_stat.st_size == src_stat.st_size and int(dest_stat.st_mtime) == int(src_stat.st_mtime)
+
+
+class FileCopier():
+    '''
+    Class that copies a list of files from a source directory to a
+    destination directory using a pool of threads.  If hardlink is True and
+    both directories are on the same filesystem the files are hardlinked
+    instead of copied.  Optionally define a progress_callback that is called
+    with the CopyProgress instance after every file.
+    '''
+
+    def __init__(self, workers=DEFAULT_COPY_WORKERS, hardlink=False, progress_callback=None):
+        self._workers = max(1, workers)
+        self._hardlink = hardlink
+        self._progress_callback = progress_callback
+        self._progress = CopyProgress()
+
+    def _copy_file(self, src_path, dest_path, use_hardlink):
+
+        try:
+            src_stat = os.stat(src_path)
+
+            if use_hardlink:
+                if os.path.exists(dest_path):
+                    if os.path.samefile(src_path, dest_path):
+                        self._progress.increment('skipped')
+                        return
+
+                    os.remove(dest_path)
+
+                os.link(src_path, dest_path)
+                self._progress.increment('linked')
+                return
+
+            if _is_unchanged(src_stat, dest_path):
+                self._progress.increment('skipped')
+                return
+
+            tmp_path = dest_path + '.tmp'
+
+            src_fd = os.open(src_path, os.O_RDONLY)
+            try:
+                dest_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    nbytes = _copy_fd(src_fd, dest_fd, src_stat.st_size)
+                finally:
+                    os.close(dest_fd)
+            finally:
+                os.close(src_fd)
+
+            os.utime(tmp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            os.replace(tmp_path, dest_path)
+
+            self._progress.increment('copied', nbytes)
+
+        except Exception as err:
+            logging.warning("Could not copy file: %s", src_path)
+            logging.debug(str(err))
+            self._progress.increment('failed')
+
+        finally:
+            if self._progress_callback is not None:
+                self._progress_callback(self._progress)
+
+            if self._progress.completed % PROGRESS_LOG_INTERVAL == 0:
+                logging.info("Copy progress: %s", self._progress)
+
+    def copy_files(self, src_dir, filenames, dest_dir, delete=False):
+        '''
+        Copy the named files from src_dir to dest_dir.  If delete is True any
+        other files in dest_dir are removed, unless filenames is empty.
+        Returns the CopyProgress instance with the final counters.
+        '''
+
+        filenames = list(dict.fromkeys(os.path.basename(filename) for filename in filenames))
+        self._progress = CopyProgress(len(filenames))
+
+        os.makedirs(dest_dir, exist_ok=True)
+
+        use_hardlink = self._hardlink and os.stat(src_dir).st_dev == os.stat(dest_dir).st_dev
+        if self._hardlink and not use_hardlink:
+            logging.warning("Source and destination are on different filesystems, copying instead of hardlinking")
+
+        if delete and not filenames:
+            logging.warning("No files to copy, not deleting the files in %s", dest_dir)
+
+        elif delete:
+            keep = set(filenames)
+            for filename in os.listdir(dest_dir):
+                path = os.path.join(dest_dir, filename)
+                if filename not in keep and os.path.isfile(path):
+                    logging.debug("Deleting: %s", path)
+                    os.remove(path)
+                    self._progress.increment('deleted')
+
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            for filename in filenames:
+                executor.submit(self._copy_file, os.path.join(src_dir, filename), os.path.join(dest_dir, filename), use_hardlink)
+
+        logging.info("Copy complete: %s", self._progress)
+
+        return self._progress
+
+    @property
+    def progress(self):
+        '''
+        Getter method for the _progress property
+        '''
+        return self._progress
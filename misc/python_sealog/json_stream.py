@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+'''
+FILE:           json_stream.py
+
+DESCRIPTION:    This script contains the helper functions used by the wrapper
+                functions to incrementally decode a top-level json array from
+                a streamed sealog-server response.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import codecs
+import json
+
+# Number of bytes read from the socket at a time
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+# Characters that may follow an item of the array
+_DELIMITERS = _WHITESPACE + ',]'
+
+def iter_json_array(chunks):
+    '''
+    Yield the items of a json array one at a time from an iterable of utf-8
+    encoded byte chunks.  Only the unparsed remainder of the input and the
+    item currently being decoded are held in memory.
+    '''
+
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+
+    def _fill(min_length):
+        '''
+        Discard the parsed portion of the buffer and read chunks until at
+        least min_length characters are unparsed or the input is exhausted.
+        '''
+
+        nonlocal buf, pos, eof
+
+        parts = [buf[pos:]]
+        length = len(parts[0])
+        while length < min_length and not eof:
+            try:
+                text = utf8.decode(next(chunks))
+            except StopIteration:
+                text = utf8.decode(b'', final=True)
+                eof = True
+
+            parts.append(text)
+            length += len(text)
+
+        buf = ''.join(parts)
+        pos = 0
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of json array")
+
+            _fill(1)
+            continue
+
+        char = buf[pos]
+
+        if not started:
+            if char != '[':
+                raise ValueError("Response is not a json array")
+
+            started = True
+            pos += 1
+            continue
+
+        if char == ']':
+            return
+
+        if char == ',':
+            pos += 1
+            continue
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+
+            # the item is incomplete, at least double the unparsed buffer
+            # before trying again so large items are not re-scanned per chunk
+            _fill(2 * (len(buf) - pos) + 1)
+            continue
+
+        # an item that is not followed by a delimiter may be truncated, i.e.
+        # the number 1.5e10 split into "1." and "5e10" decodes as 1
+        if end == len(buf) or buf[end] not in _DELIMITERS:
+            if not eof:
+                _fill(len(buf) - pos + 1)
+                continue
+
+            if end < len(buf):
+                raise ValueError("Unexpected character in json array: " + buf[end])
+
+        pos = end
+        yield item
+
+
+def iter_json_response(req, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Yield the items of the json array contained in the body of the given
+    streamed requests response.  The response is closed once the array has
+    been consumed or the generator is closed.
+    '''
+
+    try:
+        yield from iter_json_array(req.iter_content(chunk_size=chunk_size))
+    finally:
+        req.close()
@@ -19,8 +19,8 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
 from .settings import API_SERVER_URL, HEADERS, LOWERINGS_API_PATH
 
 def get_lowering_uid_by_id(lowering_id, api_server_url=API_SERVER_URL, headers=HEADERS):
@@ -30,7 +30,7 @@ def get_lowering_uid_by_id(lowering_id, api_server_url=API_SERVER_URL, headers=H
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '?lowering_id=' + lowering_id
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             lowering = json.loads(req.text)[0]
@@ -51,7 +51,7 @@ def get_lowerings(export_format='json', api_server_url=API_SERVER_URL, headers=H
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -81,7 +81,7 @@ def get_lowering_uids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, heade
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             lowerings = json.loads(req.text)
@@ -104,7 +104,7 @@ def get_lowering_ids_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, header
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             lowerings = json.loads(req.text)
@@ -129,7 +129,7 @@ def get_lowering(lowering_uid, export_format='json', api_server_url=API_SERVER_U
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/' + lowering_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -154,7 +154,7 @@ def get_lowering_by_id(lowering_id, export_format='json', api_server_url=API_SER
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '?lowering_id=' + lowering_id + '&format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -179,7 +179,7 @@ def get_lowerings_by_cruise(cruise_uid, export_format='json', api_server_url=API
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/bycruise/' + cruise_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -211,7 +211,7 @@ def get_lowering_by_event(event_uid, export_format='json', api_server_url=API_SE
 
     try:
         url = api_server_url + LOWERINGS_API_PATH + '/byevent/' + event_uid + '?format=' + export_format
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
         if req.status_code == 200:
             if export_format == 'json':
@@ -225,3 +225,22 @@ def get_lowering_by_event(event_uid, export_format='json', api_server_url=API_SE
         raise error
 
     return None
+
+
+def update_lowering(lowering_uid, payload, api_server_url=API_SERVER_URL, headers=HEADERS):
+    '''
+    Update the lowering record whose uid is lowering_uid with the contents of
+    payload.  Returns True if the update was successful.
+    '''
+
+    try:
+        url = api_server_url + LOWERINGS_API_PATH + '/' + lowering_uid
+        req = get_default_client().patch(url, headers=headers, data = json.dumps(payload))
+        logging.debug(req.text)
+
+        return req.status_code == 204
+
+    except Exception as error:
+        logging.error('Error updating lowering record')
+        logging.debug(str(error))
+        raise error
@@ -19,8 +19,8 @@ LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for det
 
 import json
 import logging
-import requests
 
+from .client import get_default_client
 from .settings import API_SERVER_URL, API_SERVER_FILE_PATH, HEADERS, EVENT_AUX_DATA_API_PATH
 
 DATA_SOURCE_FILTER = ['vehicleRealtimeFramegrabberData']
@@ -28,7 +28,8 @@ IMAGE_PATH = API_SERVER_FILE_PATH + "/images"
 
 def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
-    Get the list of framegrabs for the given lowering_uid
+    Get the list of framegrabs for the given lowering_uid.  Returns None if the
+    list could not be retrieved.
     '''
 
     logging.debug("Exporting event data")
@@ -39,23 +40,30 @@ def get_framegrab_list_by_lowering(lowering_uid, api_server_url=API_SERVER_URL,
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bylowering/' + lowering_uid + '?datasource=' + query
         logging.debug("URL: %s", url)
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
 
-        if req.status_code != 404:
-            framegrabs = json.loads(req.text)
-            for data in framegrabs:
-                for framegrab in data['data_array']:
-                    if framegrab['data_name'] == 'filename':
-                        framegrab_filenames.append(framegrab['data_value'])
+        if req.status_code == 404:
+            return framegrab_filenames
+
+        if req.status_code != 200:
+            raise ValueError("Unexpected response status: " + str(req.status_code))
+
+        framegrabs = json.loads(req.text)
+        for data in framegrabs:
+            for framegrab in data['data_array']:
+                if framegrab['data_name'] == 'filename':
+                    framegrab_filenames.append(framegrab['data_value'])
 
     except Exception as error:
         logging.error(str(error))
+        return None
 
     return framegrab_filenames
 
 def get_framegrab_list_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, headers=HEADERS):
     '''
-    Get the list of framegrabs for the given cruise_uid
+    Get the list of framegrabs for the given cruise_uid.  Returns None if the
+    list could not be retrieved.
     '''
 
     logging.debug("Exporting event data")
@@ -66,17 +74,23 @@ def get_framegrab_list_by_cruise(cruise_uid, api_server_url=API_SERVER_URL, head
     try:
         url = api_server_url + EVENT_AUX_DATA_API_PATH + '/bycruise/' + cruise_uid + '?datasource=' + query
         logging.debug("URL: %s", url)
-        req = requests.get(url, headers=headers)
+        req = get_default_client().get(url, headers=headers)
+
+        if req.status_code == 404:
+            return framegrab_filenames
+
+        if req.status_code != 200:
+            raise ValueError("Unexpected response status: " + str(req.status_code))
 
-        if req.status_code != 404:
-            framegrabs = json.loads(req.text)
-            for data in framegrabs:
-                for framegrab in data['data_array']:
-                    if framegrab['data_name'] == 'filename':
-                        framegrab_filenames.append(framegrab['data_value'])
+        framegrabs = json.loads(req.text)
+        for data in framegrabs:
+            for framegrab in data['data_array']:
+                if framegrab['data_name'] == 'filename':
+                    framegrab_filenames.append(framegrab['data_value'])
 
     except Exception as error:
         logging.error(str(error))
+        return None
 
     return framegrab_filenames
 
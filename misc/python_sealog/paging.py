@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+'''
+FILE:           paging.py
+
+DESCRIPTION:    This script contains the helper functions used by the wrapper
+                functions to page through large sealog-server responses using
+                the offset/limit query parameters.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import get_default_client
+from .settings import HEADERS
+
+# Default number of records requested per page
+DEFAULT_PAGE_SIZE = 500
+
+def get_page(url, offset, limit, headers=HEADERS):
+    '''
+    Return a single page of json records from the given url.  Returns an
+    empty list if the server has no more records.
+    '''
+
+    page_url = url + ('&' if '?' in url else '?') + 'offset=' + str(offset) + '&limit=' + str(limit)
+    req = get_default_client().get(page_url, headers=headers)
+
+    if req.status_code == 404:
+        return []
+
+    req.raise_for_status()
+
+    return json.loads(req.text)
+
+
+def iter_pages(url, page_size=DEFAULT_PAGE_SIZE, prefetch=True, headers=HEADERS):
+    '''
+    Yield the json records from the given url one at a time, requesting them
+    from the server page_size records at a time.  If prefetch is True the
+    next page is requested in the background while the current page is being
+    consumed.  Only one page (two with prefetch) is held in memory.
+    '''
+
+    if page_size < 1:
+        raise ValueError("page_size must be greater than 0")
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    try:
+        offset = 0
+        page = get_page(url, offset, page_size, headers)
+
+        while page:
+            logging.debug("Page at offset %d: %d records", offset, len(page))
+            offset += len(page)
+
+            next_page = None
+            if len(page) == page_size and executor is not None:
+                next_page = executor.submit(get_page, url, offset, page_size, headers)
+
+            yield from page
+
+            if len(page) < page_size:
+                break
+
+            page = next_page.result() if next_page is not None else get_page(url, offset, page_size, headers)
+
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
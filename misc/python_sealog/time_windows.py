@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+'''
+FILE:           time_windows.py
+
+DESCRIPTION:    This script contains the helper functions used by the wrapper
+                functions to build startTS/stopTS query parameters and to
+                split a long time window into sub-windows that are requested
+                in parallel.
+
+BUGS:
+NOTES:
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from .timestamps import parse_ts
+
+# sealog-server timestamps have millisecond resolution
+TS_RESOLUTION = timedelta(milliseconds=1)
+
+def to_datetime(ts): # pylint: disable=invalid-name
+    '''
+    Return the given timestamp as a datetime object.  ts can be a datetime
+    object or a string in the sealog-server's '%Y-%m-%dT%H:%M:%S.%fZ' format.
+    '''
+
+    if isinstance(ts, datetime):
+        return ts
+
+    return parse_ts(ts)
+
+
+def format_ts(ts): # pylint: disable=invalid-name
+    '''
+    Return the given timestamp as an ISO-8601 string with millisecond
+    resolution suitable for the startTS/stopTS query parameters.
+    '''
+
+    ts = to_datetime(ts)
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.') + '{:03d}Z'.format(ts.microsecond // 1000)
+
+
+def build_time_query(start_ts=None, stop_ts=None):
+    '''
+    Return the list of startTS/stopTS query parameters for the given
+    start_ts/stop_ts.
+    '''
+
+    querystring = []
+
+    if start_ts is not None:
+        querystring.append('startTS=' + format_ts(start_ts))
+
+    if stop_ts is not None:
+        querystring.append('stopTS=' + format_ts(stop_ts))
+
+    return querystring
+
+
+def clamp_time_window(start_ts, stop_ts, bound_start_ts, bound_stop_ts):
+    '''
+    Return the (start_ts, stop_ts) datetime tuple of the part of the time
+    window between start_ts and stop_ts that is within bound_start_ts and
+    bound_stop_ts (i.e. the cruise/lowering start_ts/stop_ts), a start_ts or
+    stop_ts of None is replaced by the bound.  Returns None if the time
+    window is outside of the bounds.  The server replaces a startTS/stopTS
+    outside of the cruise/lowering with the cruise/lowering start/stop so the
+    sub-windows of split_time_window must be within them.
+    '''
+
+    bound_start_ts = to_datetime(bound_start_ts)
+    bound_stop_ts = to_datetime(bound_stop_ts)
+
+    start_ts = bound_start_ts if start_ts is None else max(to_datetime(start_ts), bound_start_ts)
+    stop_ts = bound_stop_ts if stop_ts is None else min(to_datetime(stop_ts), bound_stop_ts)
+
+    if stop_ts < start_ts:
+        return None
+
+    return start_ts, stop_ts
+
+
+def split_time_window(start_ts, stop_ts, windows):
+    '''
+    Split the time window between start_ts and stop_ts into the given number
+    of contiguous, non-overlapping sub-windows.  Returns a list of
+    (start_ts, stop_ts) datetime tuples in ts order.  The server treats both
+    ends of a window as inclusive so each sub-window stops one
+    TS_RESOLUTION before the next one starts.
+    '''
+
+    start_ts = to_datetime(start_ts)
+    stop_ts = to_datetime(stop_ts)
+
+    if stop_ts < start_ts:
+        raise ValueError("stop_ts must be after start_ts")
+
+    # each sub-window must span at least one TS_RESOLUTION
+    windows = max(1, min(windows, int((stop_ts - start_ts) / TS_RESOLUTION)))
+    step = (stop_ts - start_ts) / windows
+
+    bounds = [start_ts + step * idx for idx in range(windows)]
+    bounds = [bound - timedelta(microseconds=bound.microsecond % 1000) for bound in bounds]
+
+    return [(bound, bounds[idx + 1] - TS_RESOLUTION if idx + 1 < windows else stop_ts) for idx, bound in enumerate(bounds)]
+
+
+def fetch_time_windows(fetch, start_ts, stop_ts, windows):
+    '''
+    Split the time window between start_ts and stop_ts into the given number
+    of sub-windows and call fetch(window_start_ts, window_stop_ts) for each
+    sub-window in parallel.  fetch must return a list of records sorted by
+    ts or None if there are no records in the sub-window.  Returns the merged
+    list of records in ts order or None if none of the sub-windows returned
+    any records.
+    '''
+
+    time_windows = split_time_window(start_ts, stop_ts, windows)
+    logging.debug("Fetching %d time windows", len(time_windows))
+
+    with ThreadPoolExecutor(max_workers=len(time_windows)) as executor:
+        results = list(executor.map(lambda window: fetch(*window), time_windows))
+
+    if all(result is None for result in results):
+        return None
+
+    # The sub-windows are disjoint and in ts order so concatenating the
+    # results preserves the ts order.
+    return [record for result in results if result is not None for record in result]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+'''
+FILE:           timestamps.py
+
+DESCRIPTION:    This script contains the fast timestamp parsing and formatting
+                functions shared by the sealog scripts, used in place of
+                datetime.strptime/strftime in per-line and per-event loops.
+
+BUGS:
+NOTES:      parse_ts uses datetime.fromisoformat, which is implemented in C
+            and is an order of magnitude faster than strptime.  Anything it
+            can not handle falls back to strptime so the accepted input and
+            raised exceptions are the same as before.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import re
+from datetime import datetime
+
+# The timestamp format used by sealog-server and the sealog scripts
+SEALOG_TS_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Formats that parse_ts can parse without falling back to strptime
+FAST_TS_FORMATS = ('%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S')
+
+# 'YYYY-MM-DDTHH:MM:SS' with up to 6 fractional second digits, the layout
+# fromisoformat is limited to since it is more lenient than strptime
+_FAST_TS_PATTERN = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{1,6})?')
+
+# Zero-padded strftime directives, in order of significance
+_ORDERED_DIRECTIVES = ['%Y', '%m', '%d', '%H', '%M', '%S', '%f']
+
+def parse_ts(ts, dt_format=SEALOG_TS_FORMAT): # pylint: disable=invalid-name
+    '''
+    Return the given ISO-8601 timestamp string as a naive datetime object.
+    Equivalent to datetime.strptime(ts, dt_format) for the FAST_TS_FORMATS.
+    '''
+
+    body = ts[:-1] if ts[-1:] == 'Z' else ts
+
+    if (body is not ts) == dt_format.endswith('Z') and _FAST_TS_PATTERN.fullmatch(body):
+        try:
+            dt = datetime.fromisoformat(body) # pylint: disable=invalid-name
+        except ValueError:
+            pass
+        else:
+            if (len(body) > 19) == ('%f' in dt_format):
+                return dt
+
+    return datetime.strptime(ts, dt_format)
+
+
+def get_ts_parser(dt_format=SEALOG_TS_FORMAT):
+    '''
+    Return the fastest function that parses timestamp strings in the given
+    dt_format to datetime objects.
+    '''
+
+    if dt_format in FAST_TS_FORMATS:
+        return lambda ts: parse_ts(ts, dt_format)
+
+    return lambda ts: datetime.strptime(ts, dt_format)
+
+
+def to_ts_string(dt): # pylint: disable=invalid-name
+    '''
+    Return the given naive datetime object as a string in SEALOG_TS_FORMAT.
+    Equivalent to dt.strftime(SEALOG_TS_FORMAT).
+    '''
+
+    return dt.isoformat(timespec='microseconds') + 'Z'
+
+
+def is_lexicographic_format(dt_format):
+    '''
+    Return True if timestamp strings written with the given dt_format sort
+    in time order when compared as plain strings, i.e. the format only
+    contains zero-padded fields ordered from most to least significant.
+    '''
+
+    directives = re.findall(r'%.', dt_format)
+
+    if not directives or directives[0] != '%Y':
+        return False
+
+    return directives == _ORDERED_DIRECTIVES[:len(directives)]
+
+
+def match_ts_width(ts, sample): # pylint: disable=invalid-name
+    '''
+    Return the timestamp string ts with its fractional seconds truncated or
+    zero-padded to the same number of digits as the sample timestamp string
+    so that the two can be compared lexicographically.
+    '''
+
+    if len(ts) == len(sample) or '.' not in ts or '.' not in sample:
+        return ts
+
+    head, tail = ts.rsplit('.', 1)
+    digits = len(tail) - len(tail.lstrip('0123456789'))
+
+    sample_tail = sample.rsplit('.', 1)[1]
+    sample_digits = len(sample_tail) - len(sample_tail.lstrip('0123456789'))
+
+    return head + '.' + tail[:min(digits, sample_digits)].ljust(sample_digits, '0') + tail[digits:]
+
+
+def build_ts_pattern(ts): # pylint: disable=invalid-name
+    '''
+    Return a compiled regular expression that matches timestamp strings with
+    the same layout as ts, i.e. for validating timestamps compared as
+    strings.
+    '''
+
+    return re.compile(re.sub(r'\d', r'\\d', re.escape(ts)))
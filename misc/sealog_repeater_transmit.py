@@ -3,12 +3,13 @@
 #
 
 import asyncio
-import websockets
-import json
-import requests
+import logging
 
+from python_sealog.event_spool import EventSpool
+from python_sealog.aio.event_repeater import EventRepeater, DEFAULT_BATCH_SIZE
 
-eventsAPIPath = '/api/v1/events'
+# Local append-only log of the events waiting to be forwarded
+SPOOL_FILE = 'sealog_repeater_transmit_spool.db'
 
 localServerIP = '0.0.0.0'
 localServerAPIPort = '8000'
@@ -47,28 +48,33 @@ ping = {
 localHeaders = {'authorization': localToken}
 remoteHeaders = {'authorization': remoteToken}
 
-async def eventlog():
-    try:
-        async with websockets.connect('ws://' + localServerIP + ':' + localServerWSPort) as websocket:
-
-            await websocket.send(json.dumps(hello))
+async def eventlog(spool_file=SPOOL_FILE, batch_size=DEFAULT_BATCH_SIZE, compress=False):
+    with EventSpool(spool_file) as spool:
+        repeater = EventRepeater(spool, 'http://' + remoteServerIP + ':' + remoteServerAPIPort + remoteServerPath, remoteHeaders, batch_size, compress)
+        await repeater.run('ws://' + localServerIP + ':' + localServerWSPort, hello, ping)
 
-            while(True):
+if __name__ == '__main__':
 
-                event = await websocket.recv()
-                eventObj = json.loads(event)
-                print("eventObj:", eventObj)
+    import argparse
 
-                if eventObj['type'] and eventObj['type'] == 'ping':
-                    await websocket.send(json.dumps(ping))
-                elif eventObj['type'] and eventObj['type'] == 'pub':
+    parser = argparse.ArgumentParser(description='Sealog Event Repeater - local to remote')
+    parser.add_argument('-v', '--verbosity', dest='verbosity',
+                        default=0, action='count',
+                        help='Increase output verbosity')
+    parser.add_argument('-s', '--spool_file', default=SPOOL_FILE, help='events waiting to be forwarded are stored in SPOOL_FILE (default: %(default)s)')
+    parser.add_argument('-b', '--batch_size', type=int, default=DEFAULT_BATCH_SIZE, help='maximum number of events forwarded at the same time (default: %(default)s)')
+    parser.add_argument('-z', '--compress', action='store_true', default=False, help='gzip compress the forwarded events')
 
-                    r = requests.post('http://' + remoteServerIP + ':' + remoteServerAPIPort + remoteServerPath + eventsAPIPath, headers=remoteHeaders, data = json.dumps(eventObj['message']))
-                    print(r.text)
+    parsed_args = parser.parse_args()
 
-                    ### end of repeat
+    LOGGING_FORMAT = '%(asctime)-15s %(levelname)s - %(message)s'
+    logging.basicConfig(format=LOGGING_FORMAT)
 
-    except Exception as error:
-        print(error)
+    LOG_LEVELS = {0: logging.WARNING, 1: logging.INFO, 2: logging.DEBUG}
+    parsed_args.verbosity = min(parsed_args.verbosity, max(LOG_LEVELS))
+    logging.getLogger().setLevel(LOG_LEVELS[parsed_args.verbosity])
 
-asyncio.get_event_loop().run_until_complete(eventlog())
+    try:
+        asyncio.get_event_loop().run_until_complete(eventlog(parsed_args.spool_file, parsed_args.batch_size, parsed_args.compress))
+    except KeyboardInterrupt:
+        logging.error('Keyboard Interrupted')
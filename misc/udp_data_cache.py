@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+'''
+FILE:           udp_data_cache.py
+
+DESCRIPTION:    This script contains the backends used by cache_udp_data.py to
+                store the latest record of each label and by
+                sealog_aux_data_inserter.py to read it.
+
+BUGS:
+NOTES:      The mongodb backend stores the records in the
+            sealog_udp_cache.udpData collection.  The shared_memory backend
+            stores each label in its own multiprocessing.shared_memory
+            segment, protected by a seqlock, so the latest record can be read
+            without a database round trip.  The segments outlive the
+            processes so the readers are not affected by cache_udp_data.py
+            restarts, use unlink() to remove them.
+AUTHOR:     Webb Pinner
+COMPANY:    OceanDataTools.org
+VERSION:    0.1
+CREATED:    2026-10-16
+REVISION:
+
+LICENSE INFO:   This code is licensed under MIT license (see LICENSE.txt for details)
+                Copyright (C) OceanDataTools.org 2021
+'''
+
+import json
+import time
+import ctypes
+import struct
+import logging
+import threading
+from datetime import datetime, timezone
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+try:
+    from pymongo import MongoClient, UpdateOne
+except ImportError:
+    MongoClient = None
+
+DATABASE = 'sealog_udp_cache'
+COLLECTION = 'udpData'
+
+CACHE_BACKENDS = ('mongodb', 'shared_memory')
+DEFAULT_CACHE_BACKEND = 'mongodb'
+
+# Prefix of the shared memory segment names
+SHARED_MEMORY_PREFIX = 'sealog_udp_cache_'
+
+# Size of the shared memory segment of each label, the JSON encoded data of
+# a record must fit in SHARED_MEMORY_SIZE - DATA_OFFSET bytes
+SHARED_MEMORY_SIZE = 4096
+
+# The segment starts with the uint64 sequence number, it is accessed through
+# ctypes so it is written with a single store (struct.pack_into zeroes the
+# bytes first), followed by the updated time (seconds since the epoch) and
+# length of the data
+HEADER = struct.Struct('<dI')
+HEADER_OFFSET = ctypes.sizeof(ctypes.c_uint64)
+DATA_OFFSET = HEADER_OFFSET + HEADER.size
+
+# Maximum number of seconds a read is retried while the record is being
+# written
+READ_TIMEOUT = 0.1
+
+class MongoUDPDataCache():
+    '''
+    Class that stores the latest record of each label in a MongoDB
+    collection.
+    '''
+
+    def __init__(self, database=DATABASE, collection=COLLECTION):
+
+        if MongoClient is None:
+            raise ImportError("pymongo is required by the mongodb cache backend")
+
+        self._client = MongoClient()
+        self._collection = self._client[database][collection]
+
+    def write(self, record):
+        '''
+        Store the record, replacing the previous record with the same label.
+        '''
+
+        self._collection.update_one({'label': record['label']}, {'$set': record}, upsert=True)
+
+    def write_many(self, records):
+        '''
+        Store the records with a single bulk_write.
+        '''
+
+        self._collection.bulk_write([ UpdateOne({'label': record['label']}, {'$set': record}, upsert=True) for record in records ], ordered=False)
+
+    def read(self, label):
+        '''
+        Return the latest record with the given label or None.
+        '''
+
+        return self._collection.find_one({'label': label})
+
+    def read_many(self, labels):
+        '''
+        Return the latest record of each of the given labels as a dict keyed
+        by label, using a single query.  Labels without a record are omitted.
+        '''
+
+        return { record['label']: record for record in self._collection.find({'label': {'$in': list(labels)}}) }
+
+    def close(self):
+        '''
+        Close the connection to the database.
+        '''
+
+        self._client.close()
+
+
+def _attach_shared_memory(label, create=False):
+    '''
+    Attach to the shared memory segment of the label, creating it if create
+    is True.  Raises FileNotFoundError if the segment does not exist.  The
+    segment is not unlinked when the process exits.
+    '''
+
+    name = SHARED_MEMORY_PREFIX + label
+
+    try:
+        segment = SharedMemory(name)
+    except FileNotFoundError:
+        if not create:
+            raise
+        segment = SharedMemory(name, create=True, size=SHARED_MEMORY_SIZE)
+
+    # the resource tracker would unlink the segment when this process exits
+    resource_tracker.unregister(segment._name, 'shared_memory') # pylint: disable=protected-access
+
+    return segment
+
+
+class SharedMemoryUDPDataCache():
+    '''
+    Class that stores the latest record of each label in a shared memory
+    segment.  Writers increment the segment's sequence number before and
+    after writing, readers retry until they see the same even sequence
+    number before and after reading.  Only one process may write a given
+    label.
+    '''
+
+    def __init__(self):
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    def _get_segment(self, label, create=False):
+        '''
+        Return the (segment, sequence number) of the label.  When create is
+        True an odd sequence number left by an interrupted writer is made
+        even.
+        '''
+
+        segment = self._segments.get(label)
+
+        if segment is None:
+            with self._lock:
+                if label not in self._segments:
+                    shared_memory = _attach_shared_memory(label, create)
+                    sequence = ctypes.c_uint64.from_buffer(shared_memory.buf)
+
+                    # a writer that stopped mid-write left the sequence number
+                    # odd, make it even again so the readers recover
+                    if create and sequence.value % 2:
+                        logging.warning("Recovering interrupted write to the shared memory cache: %s", label)
+                        sequence.value += 1
+
+                    self._segments[label] = (shared_memory, sequence)
+                segment = self._segments[label]
+
+        return segment
+
+    def write(self, record):
+        '''
+        Store the record, replacing the previous record with the same label.
+        '''
+
+        data = json.dumps(record['data']).encode('utf-8')
+
+        if DATA_OFFSET + len(data) > SHARED_MEMORY_SIZE:
+            raise ValueError("Record too large for the shared memory cache: " + record['label'])
+
+        updated = record['updated'].replace(tzinfo=timezone.utc).timestamp()
+        shared_memory, sequence = self._get_segment(record['label'], create=True)
+
+        sequence.value += 1
+        try:
+            HEADER.pack_into(shared_memory.buf, HEADER_OFFSET, updated, len(data))
+            shared_memory.buf[DATA_OFFSET:DATA_OFFSET + len(data)] = data
+        finally:
+            sequence.value += 1
+
+    def write_many(self, records):
+        '''
+        Store the records.
+        '''
+
+        for record in records:
+            self.write(record)
+
+    def read(self, label):
+        '''
+        Return the latest record with the given label or None.
+        '''
+
+        try:
+            shared_memory, sequence = self._get_segment(label)
+        except FileNotFoundError:
+            return None
+
+        deadline = None
+
+        while True:
+            start_sequence = sequence.value
+
+            if start_sequence % 2 == 0:
+                updated, length = HEADER.unpack_from(shared_memory.buf, HEADER_OFFSET)
+                data = bytes(shared_memory.buf[DATA_OFFSET:DATA_OFFSET + min(length, SHARED_MEMORY_SIZE - DATA_OFFSET)])
+
+                if sequence.value == start_sequence:
+                    break
+
+            # the writer may have been preempted mid-write, yield to it
+            deadline = deadline or time.monotonic() + READ_TIMEOUT
+            if time.monotonic() > deadline:
+                logging.warning("Unable to read the shared memory cache: %s", label)
+                return None
+
+            time.sleep(0)
+
+        if start_sequence == 0:
+            return None
+
+        return {
+            'label': label,
+            'updated': datetime.utcfromtimestamp(updated),
+            'data': json.loads(data)
+        }
+
+    def read_many(self, labels):
+        '''
+        Return the latest record of each of the given labels as a dict keyed
+        by label.  Labels without a record are omitted.
+        '''
+
+        records = { label: self.read(label) for label in labels }
+        return { label: record for label, record in records.items() if record }
+
+    def close(self):
+        '''
+        Detach from the shared memory segments.
+        '''
+
+        with self._lock:
+            while self._segments:
+                # drop the sequence number first, it holds an export of the buffer
+                shared_memory = self._segments.popitem()[1][0]
+                shared_memory.close()
+
+    @staticmethod
+    def unlink(label):
+        '''
+        Remove the shared memory segment of the label.
+        '''
+
+        try:
+            segment = SharedMemory(SHARED_MEMORY_PREFIX + label)
+        except FileNotFoundError:
+            return
+
+        segment.close()
+        segment.unlink()
+
+
+def get_udp_data_cache(backend=DEFAULT_CACHE_BACKEND):
+    '''
+    Return the cache for the backend, one of CACHE_BACKENDS.
+    '''
+
+    if backend == 'mongodb':
+        return MongoUDPDataCache()
+
+    if backend == 'shared_memory':
+        return SharedMemoryUDPDataCache()
+
+    raise ValueError("backend must be one of: " + ', '.join(CACHE_BACKENDS))
@@ -205,20 +205,28 @@ exports.plugin = {
           as: "aux_data"
         };
 
+        // Page the events before the lookup so offset/limit are applied in
+        // ts order (_id breaks ties between events with the same ts so pages
+        // never overlap) and only the requested page is joined with its aux_data.
         const aggregate = [];
         aggregate.push({ $match: query });
-        aggregate.push({ $lookup: lookup });
-        aggregate.push({ $sort: { ts: 1 } });
+        aggregate.push({ $sort: { ts: 1, _id: 1 } });
+
+        if (offset) {
+          aggregate.push({ $skip: offset });
+        }
 
         if (request.query.limit) {
           aggregate.push({ $limit: request.query.limit });
         }
 
+        aggregate.push({ $lookup: lookup });
+
         // console.log("aggregate:", aggregate);
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
         }
         catch (err) {
           console.log(err);
@@ -331,20 +339,28 @@ exports.plugin = {
           as: "aux_data"
         };
 
+        // Page the events before the lookup so offset/limit are applied in
+        // ts order (_id breaks ties between events with the same ts so pages
+        // never overlap) and only the requested page is joined with its aux_data.
         const aggregate = [];
         aggregate.push({ $match: query });
-        aggregate.push({ $lookup: lookup });
-        aggregate.push({ $sort: { ts: 1 } });
+        aggregate.push({ $sort: { ts: 1, _id: 1 } });
+
+        if (offset) {
+          aggregate.push({ $skip: offset });
+        }
 
         if (request.query.limit) {
           aggregate.push({ $limit: request.query.limit });
         }
 
+        aggregate.push({ $lookup: lookup });
+
         // console.log("aggregate:", aggregate);
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).skip(offset).toArray();
+          results = await db.collection(eventsTable).aggregate(aggregate, { allowDiskUse: true }).toArray();
         }
         catch (err) {
           console.log(err);
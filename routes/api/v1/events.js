@@ -322,7 +322,7 @@ exports.plugin = {
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).find(query).sort( { ts: 1  } ).skip(offset).limit(limit).toArray();
+          results = await db.collection(eventsTable).find(query).sort( { ts: 1, _id: 1 } ).skip(offset).limit(limit).toArray();
           // console.log("results:", results);
         }
         catch (err) {
@@ -560,7 +560,7 @@ exports.plugin = {
         let results = [];
 
         try {
-          results = await db.collection(eventsTable).find(query).sort( { ts: 1  } ).skip(offset).limit(limit).toArray();
+          results = await db.collection(eventsTable).find(query).sort( { ts: 1, _id: 1 } ).skip(offset).limit(limit).toArray();
           // console.log("results:", results);
         }
         catch (err) {